@@ -1,16 +1,48 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import pickle
-from collections import defaultdict
 from sklearn.exceptions import InconsistentVersionWarning
 import warnings
-import base64
-import time
+import html
+import io
+import re
+import glob
 import os
+import time
+import sqlite3
+from loaders import read_data, read_model
+from kb_bundle import load_bundle
+from class_map import ClassMapError, class_map_path, load_class_map, validate_class_map
+from differential import DifferentialDiagnoser
+from knowledge_base import SYMPTOM_COLS, build_disease_records, build_knowledge_base, clean_disease_name
+from matching import SymptomMatcher
+from metrics import METRICS, MetricsExporter, SamplingProfiler, profiling_requested, serve_metrics
+from narrowing import CandidateNarrower
+from prediction_cache import PredictionCache, cache_key, namespace_for
+from recommendations import SECTIONS, RecommendationService
+from risk import RiskScorer
+from symptom_index import SymptomIndex, normalize_symptom, parse_symptoms
 warnings.filterwarnings("ignore", category=InconsistentVersionWarning)
 DATA_DIR = "datasets"
-MODEL_PATH = "models/svc.pkl"
+# Point several app processes at an exported artifact (models/artifacts/svc) to share its mmap'd arrays
+MODEL_PATH = os.environ.get("SYMPTOCURE_MODEL", "models/svc.pkl")
+PREDICTION_CACHE_PATH = ".cache/predictions.sqlite"
+# Bump when the shape of predict_symptoms() results changes, so persisted entries aren't reused
+PREDICTION_RESULT_VERSION = 3
+METRICS_PATH = ".cache/metrics.json"
+PROFILE_PATH = ".cache/profile.folded"
+COVER_PATH = "cover.jpg"
+VISUALIZATIONS_DIR = "visualizations"
+# st.image re-scales anything wider than this on every rerun, so images are fitted once up front
+MAX_IMAGE_WIDTH = 1460
+METRICS_PORT_ENV = "SYMPTOCURE_METRICS_PORT"
+PAGE_STAGES = {
+    "🏠 Welcome": "welcome",
+    "🔍 Predict Disease": "predict",
+    "📋 Disease Info": "disease_info",
+    "📊 Visualizations": "visualizations",
+    "ℹ️ About": "about",
+}
+RECOMMENDATION_TABS = dict(zip(SECTIONS, ["Description", "Diet", "Medications", "Precautions", "Workouts"]))
 CSS = """
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;600;700&display=swap');
@@ -121,7 +153,7 @@ body {
     margin-right: 1rem;
     color: var(--primary);
 }
-.cover-img {
+.cover-img, .st-key-cover img {
     width: 100%;
     border-radius: 15px;
     box-shadow: 0 15px 30px rgba(0,0,0,0.1);
@@ -212,84 +244,289 @@ DISEASE_INFO_HTML = """
     <p>Comprehensive health resources at your fingertips</p>
 </div>
 """
-def clean_disease_name(name):
-    """Standardize disease names for comparison"""
-    name = str(name).lower().strip()
-    name = name.replace("(", "").replace(")", "")
-    name = name.replace("paroymsal", "paroxysmal")  
-    name = name.replace("  ", " ") 
-    return name
 @st.cache_resource
+@METRICS.timed("load.model")
 def load_model():
     if not os.path.exists(MODEL_PATH):
         st.error(f"Model file not found at {MODEL_PATH}")
         return None
-    return pickle.load(open(MODEL_PATH, 'rb'))
-@st.cache_data
+    return read_model(MODEL_PATH)
+@st.cache_resource
+@METRICS.timed("load.labels")
+def load_labels():
+    model = load_model()
+    if model is None:
+        return None
+    try:
+        labels = load_class_map(MODEL_PATH)
+        validate_class_map(model, labels, os.path.join(DATA_DIR, 'Training.csv'), load_bundle_cached())
+    except ClassMapError as exc:
+        st.error(f"Model class map check failed: {exc}")
+        return None
+    return labels
+@st.cache_resource
+@METRICS.timed("load.bundle")
+def load_bundle_cached():
+    try:
+        return load_bundle(DATA_DIR)
+    except (OSError, ValueError, KeyError) as exc:
+        st.warning(f"Knowledge-base bundle unavailable, reading CSVs instead ({exc})")
+        return None
+@st.cache_resource
+@METRICS.timed("load.data")
 def load_data():
-    data_files = {
-        'symptom_severity': 'Symptom-severity.csv',
-        'symptoms_df': 'symtoms_df.csv',
-        'diets_df': 'diets.csv',
-        'meds_df': 'medications.csv',
-        'workout_df': 'workout_df.csv',
-        'precautions_df': 'precautions_df.csv',
-        'desc_df': 'description.csv'
+    bundle = load_bundle_cached()
+    if bundle is not None:
+        return bundle.frames()
+    return read_data(DATA_DIR, on_missing=lambda filepath: st.error(f"Data file not found: {filepath}"))
+@st.cache_resource
+@METRICS.timed("load.knowledge_base")
+def load_knowledge_base():
+    symptoms_df = load_data().get('symptoms_df', pd.DataFrame(columns=['Disease'] + SYMPTOM_COLS))
+    return build_knowledge_base(symptoms_df)
+@st.cache_resource
+@METRICS.timed("load.disease_records")
+def load_disease_records():
+    return build_disease_records(load_data())
+@st.cache_resource
+@METRICS.timed("load.matcher")
+def load_matcher():
+    return SymptomMatcher.from_knowledge_base(load_knowledge_base())
+@st.cache_resource
+@METRICS.timed("load.symptom_index")
+def load_symptom_index():
+    severity = load_data().get('symptom_severity', pd.DataFrame(columns=['Symptom']))
+    return SymptomIndex(load_model().feature_names_in_, severity['Symptom'].tolist(), fuzzy=True)
+@st.cache_resource
+@METRICS.timed("load.risk_scorer")
+def load_risk_scorer():
+    severity = load_data().get('symptom_severity', pd.DataFrame(columns=['Symptom', 'weight']))
+    return RiskScorer.from_severity(load_symptom_index(), severity)
+@st.cache_resource
+@METRICS.timed("load.prediction_cache")
+def load_prediction_cache():
+    dependencies = [MODEL_PATH, class_map_path(MODEL_PATH)] + glob.glob(os.path.join(DATA_DIR, '*.csv'))
+    try:
+        return PredictionCache(maxsize=2048, ttl=24 * 3600, store_path=PREDICTION_CACHE_PATH,
+                               namespace=f"{namespace_for(dependencies)}-v{PREDICTION_RESULT_VERSION}")
+    except (OSError, sqlite3.Error):
+        return PredictionCache(maxsize=2048, ttl=24 * 3600)
+@st.cache_resource
+@METRICS.timed("load.differential")
+def load_differential():
+    diagnoser = DifferentialDiagnoser(load_model(), load_labels(), load_knowledge_base(), load_matcher())
+    bundle = load_bundle_cached()
+    if bundle is not None:
+        X, codes, _, _ = bundle.training()
+    else:
+        training = pd.read_csv(os.path.join(DATA_DIR, 'Training.csv'))
+        codes, _ = pd.factorize(training.pop('prognosis'), sort=True)
+        X = training.to_numpy()
+    return diagnoser.calibrate(X, codes)
+@st.cache_resource
+@METRICS.timed("load.recommendations")
+def load_recommendations():
+    return RecommendationService.from_records(load_disease_records())
+@st.cache_resource
+@METRICS.timed("load.narrower")
+def load_narrower():
+    kb, matcher, symptom_index = load_knowledge_base(), load_matcher(), load_symptom_index()
+    bundle = load_bundle_cached()
+    if bundle is not None:
+        return CandidateNarrower.from_bundle(kb, matcher, bundle, symptom_index)
+    training = pd.read_csv(os.path.join(DATA_DIR, 'Training.csv'))
+    codes, _ = pd.factorize(training.pop('prognosis'), sort=True)
+    return CandidateNarrower(kb, matcher, training.to_numpy(), codes, symptom_index)
+@st.cache_resource
+def start_metrics():
+    """Export stage timings to METRICS_PATH every 10s; profile and serve them over HTTP when opted in"""
+    METRICS.register("prediction_cache", lambda: load_prediction_cache().stats())
+    profiler = SamplingProfiler().start() if profiling_requested() else None
+    exporter = MetricsExporter(METRICS, METRICS_PATH, profiler=profiler, profile_path=PROFILE_PATH).start()
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        try:
+            serve_metrics(METRICS, port=int(port), profiler=profiler)
+        except (OSError, ValueError) as exc:
+            st.warning(f"Metrics endpoint unavailable on port {port} ({exc})")
+    return exporter
+def predict_symptoms(model, labels, symptom_keys):
+    """Prediction, top-5 differential and risk for canonical symptom keys, as a cacheable dict"""
+    METRICS.count("predict.computed")
+    with METRICS.timer("predict.vectorize"):
+        input_vector, _ = load_symptom_index().vectorize(symptom_keys)
+    with METRICS.timer("predict.model"):
+        differential = load_differential().rank(input_vector, symptom_keys, k=5)
+    # Banner, precautions and recommendations all follow the differential's first entry (the model's prediction)
+    prediction = differential[0].disease
+    with METRICS.timer("predict.risk"):
+        risk = load_risk_scorer().assess(input_vector, prediction, load_disease_records())
+    return {
+        'prediction': prediction,
+        'differential': [list(entry) for entry in differential],
+        'risk': {field: list(value) if isinstance(value, tuple) else value for field, value in risk._asdict().items()},
     }
-    data = {}
-    for key, filename in data_files.items():
-        filepath = os.path.join(DATA_DIR, filename)
-        if not os.path.exists(filepath):
-            st.error(f"Data file not found: {filepath}")
-            continue       
-        df = pd.read_csv(filepath)
-        if 'Disease' in df.columns:
-            df['Disease'] = df['Disease'].str.strip()
-            df['Disease'] = df['Disease'].str.replace(r'\s+', ' ', regex=True) 
-        data[key] = df
-    return data
+@st.cache_resource
+def load_css():
+    """CSS with comments and indentation stripped; it is re-sent on every rerun"""
+    css = re.sub(r"/\*.*?\*/", "", CSS, flags=re.S)
+    return re.sub(r"\s*([{};,>])\s*", r"\1", re.sub(r"\s+", " ", css)).strip()
+def fit_image(path):
+    """(bytes, format) of the image at path, downscaled to MAX_IMAGE_WIDTH if wider"""
+    from PIL import Image
+    with open(path, "rb") as f:
+        data = f.read()
+    image = Image.open(io.BytesIO(data))
+    if image.width <= MAX_IMAGE_WIDTH:
+        return data, image.format
+    height = int(image.height * MAX_IMAGE_WIDTH / image.width)
+    out = io.BytesIO()
+    image.resize((MAX_IMAGE_WIDTH, height), Image.BILINEAR).save(out, format=image.format, quality=90)
+    return out.getvalue(), image.format
+@st.cache_resource
+def load_cover_image():
+    return fit_image(COVER_PATH) if os.path.exists(COVER_PATH) else None
+def bar_chart_spec(counts):
+    """Vega-Lite bar chart of a value_counts() series with the data inlined, as st.bar_chart draws it"""
+    return {
+        "data": {"values": [{"label": str(label), "count": int(n)} for label, n in counts.items()]},
+        "mark": "bar",
+        "encoding": {
+            "x": {"field": "label", "type": "nominal", "sort": None, "title": None},
+            "y": {"field": "count", "type": "quantitative", "title": None},
+        },
+    }
+@st.cache_resource
+def load_chart_specs():
+    """Top-10 symptom and disease count charts for the Visualizations page, built once"""
+    symptoms_df = load_data().get('symptoms_df', pd.DataFrame())
+    if symptoms_df.empty:
+        return None, None
+    symptom_counts = symptoms_df[SYMPTOM_COLS].stack().value_counts().head(10)
+    disease_counts = symptoms_df['Disease'].value_counts().head(10) if 'Disease' in symptoms_df.columns else None
+    return bar_chart_spec(symptom_counts), bar_chart_spec(disease_counts) if disease_counts is not None else None
+@st.cache_resource
+def load_figures():
+    """(title, image bytes, format) for the notebook's saved figures in visualizations/"""
+    return [
+        (os.path.splitext(os.path.basename(path))[0].replace('_', ' ').capitalize(), *fit_image(path))
+        for path in sorted(glob.glob(os.path.join(VISUALIZATIONS_DIR, '*.png')))
+    ]
+@st.cache_resource
+def load_disease_tables():
+    """Disease Info tab tables per disease, built once instead of on every rerun"""
+    return {
+        name: {
+            column: pd.DataFrame({column: values})
+            for column, values in (("Diet", record.diets), ("Medication", record.medications),
+                                   ("Precaution", record.precautions), ("Workout", record.workouts))
+            if values
+        }
+        for name, record in load_disease_records().items()
+    }
+@st.cache_resource
+def load_disease_symptom_keys():
+    """(symptom, canonical key) pairs per disease, for marking matched symptoms"""
+    return {disease: [(symptom, normalize_symptom(symptom)) for symptom in symptoms]
+            for disease, symptoms in load_knowledge_base().disease_symptoms.items()}
+def match_html(disease, count, total, symptom_keys):
+    """Whole body of one match expander as a single HTML block"""
+    percentage = int((count / total) * 100) if total else 0
+    symptoms = load_disease_symptom_keys().get(disease, [])
+    matched = "".join(f"<li>✅ {html.escape(s)}</li>" for s, key in symptoms if key in symptom_keys)
+    missing = "".join(f"<li>◻️ {html.escape(s)}</li>" for s, key in symptoms if key not in symptom_keys)
+    body = (
+        f'<div style="margin-bottom: 10px;"><p><b>{count} out of {total}</b> symptoms matched</p>'
+        f'<progress value="{percentage}" max="100" style="width: 100%; height: 10px;"></progress></div>'
+        f'<div><p><b>Common symptoms:</b></p><ul>{matched}</ul>'
+    )
+    if missing:
+        body += f'<p><b>Other symptoms to watch for:</b></p><ul>{missing}</ul>'
+    return body + '</div>'
+def recommendation_markdown(section, value):
+    if not value:
+        return f"No {RECOMMENDATION_TABS[section].lower()} information available"
+    return value if section == 'description' else "\n".join(f"- {item}" for item in value)
 def render_cover_image():
-    cover_path = "cover.jpg"
-    if os.path.exists(cover_path):
-        with open(cover_path, "rb") as f:
-            encoded_image = base64.b64encode(f.read()).decode()
-        st.markdown(
-            f"""
-            <div style="text-align: center;">
-                <img class="cover-img" src="data:image/jpeg;base64,{encoded_image}" alt="Health Cover Image">
-            </div>
-            """,
-            unsafe_allow_html=True
-        )
+    cover = load_cover_image()
+    if cover is not None:
+        # Served once by URL and cached by the browser instead of a base64 copy in every rerun
+        data, image_format = cover
+        with st.container(key="cover"):
+            st.image(data, width="stretch", output_format=image_format)
     else:
         st.warning("Cover image not found")
+def on_step_symptoms_changed():
+    narrower = load_narrower()
+    state = st.session_state.get('narrowing') or narrower.start()
+    selected = st.session_state.step_symptoms
+    with METRICS.timer("narrow.update"):
+        if set(state.present) <= set(selected):
+            for symptom in selected:
+                state = narrower.add(state, symptom)
+        else:
+            state = narrower.replay(selected, state.absent)
+    st.session_state.narrowing = state
+def answer_suggestion(symptom, present):
+    narrower = load_narrower()
+    state = st.session_state.get('narrowing') or narrower.start()
+    with METRICS.timer("narrow.update"):
+        st.session_state.narrowing = narrower.add(state, symptom, present)
+    if present:
+        st.session_state.step_symptoms = st.session_state.get('step_symptoms', []) + [symptom]
+def reset_step_by_step():
+    st.session_state.narrowing = load_narrower().start()
+    st.session_state.step_symptoms = []
+def render_step_by_step(model, labels):
+    """Add symptoms one at a time; candidates and the next question update on every change"""
+    narrower = load_narrower()
+    state = st.session_state.get('narrowing') or narrower.start()
+    st.multiselect(
+        "Add your symptoms one at a time",
+        narrower.symptoms,
+        key="step_symptoms",
+        format_func=lambda key: key.replace('_', ' '),
+        on_change=on_step_symptoms_changed,
+    )
+    candidates = narrower.candidates(state)
+    if state.present:
+        if candidates:
+            st.info(f"**{len(candidates)} candidate diseases:** {', '.join(candidates)}")
+        else:
+            st.warning("No single disease lists all of these symptoms; showing the closest matches")
+        for disease, count, total in narrower.top_matches(state, k=5):
+            st.markdown(f"- {disease}: {count} of {total} symptoms")
+    with METRICS.timer("narrow.suggest"):
+        suggestions = narrower.suggest(state, k=1)
+    if suggestions and len(candidates) != 1:
+        symptom = suggestions[0][0]
+        st.markdown(f"**Do you also have {symptom.replace('_', ' ')}?**")
+        yes, no = st.columns(2)
+        yes.button("Yes", on_click=answer_suggestion, args=(symptom, True), use_container_width=True)
+        no.button("No", on_click=answer_suggestion, args=(symptom, False), use_container_width=True)
+    if state.present or state.absent:
+        st.button("Start over", on_click=reset_step_by_step)
+    if state.present and st.button("🔍 Predict Disease", use_container_width=True):
+        result = load_prediction_cache().get_or_compute(
+            cache_key(state.present), lambda: predict_symptoms(model, labels, list(state.present))
+        )
+        st.success(f"**Predicted Disease:** {result['prediction']}")
+        risk = result['risk']
+        st.metric("Risk score", f"{risk['score']:g}", f"{risk['urgency']} urgency", delta_color="off")
 def main():
-    st.markdown(CSS, unsafe_allow_html=True)
+    st.markdown(load_css(), unsafe_allow_html=True)
+    start_metrics()
     model = load_model()
+    labels = load_labels()
     data = load_data()
-    if not data or model is None:
+    if not data or model is None or labels is None:
         st.error("Failed to load required data or model. Please check file paths.")
         return
-    symptom_severity = data.get('symptom_severity', pd.DataFrame())
-    symptoms_df = data.get('symptoms_df', pd.DataFrame())
-    diets_df = data.get('diets_df', pd.DataFrame())
-    meds_df = data.get('meds_df', pd.DataFrame())
-    workout_df = data.get('workout_df', pd.DataFrame())
-    precautions_df = data.get('precautions_df', pd.DataFrame())
-    desc_df = data.get('desc_df', pd.DataFrame())
-    symptom_cols = ['Symptom_1', 'Symptom_2', 'Symptom_3', 'Symptom_4']
-    disease_symptoms = defaultdict(set)
-    symptom_diseases = defaultdict(set)
-    for _, row in symptoms_df.iterrows():
-        disease = row['Disease']
-        symptoms = [row[col].strip() for col in symptom_cols if pd.notna(row[col]) and row[col] != '']
-        disease_symptoms[disease].update(symptoms)
-        for s in symptoms:
-            symptom_diseases[s].add(disease)
-    disease_symptoms = {k: sorted(v) for k, v in disease_symptoms.items()}
-    symptom_diseases = {k: sorted(v) for k, v in symptom_diseases.items()}
+    kb = load_knowledge_base()
+    disease_symptoms = kb.disease_symptoms
     st.sidebar.title("Navigation")
     page = st.sidebar.radio("Go to", ["🏠 Welcome", "🔍 Predict Disease", "📋 Disease Info", "📊 Visualizations", "ℹ️ About"])
+    page_start = time.perf_counter()
     if page == "🏠 Welcome":
         st.markdown(WELCOME_HTML, unsafe_allow_html=True)
         render_cover_image()
@@ -307,155 +544,157 @@ def main():
         )
     elif page == "🔍 Predict Disease":
         st.markdown(PREDICTION_HTML, unsafe_allow_html=True)
-        with st.form("prediction_form"):
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                symptoms_input = st.text_input(
-                    'Enter your symptoms (comma separated)',
-                    'itching, skin rash, fatigue',
-                    help="Example: headache, fever, cough"
-                )
-            with col2:
-                st.write("") 
-                st.write("")  
-                submitted = st.form_submit_button(
-                    "🔍 Predict Disease",
-                    use_container_width=True
-                )
-            if submitted:
-                with st.spinner('Analyzing symptoms...'):
-                    time.sleep(1) 
-                    input_symptoms = [s.strip().lower() for s in symptoms_input.split(',')]
-                    input_vector = np.zeros(len(model.feature_names_in_))
-                    for s in input_symptoms:
-                        if s in model.feature_names_in_:
-                            idx = np.where(model.feature_names_in_ == s)[0][0]
-                            input_vector[idx] = 1
-                    prediction_idx = model.predict([input_vector])[0]
-                    disease_names = sorted(disease_symptoms.keys())
-                    try:
-                        prediction = disease_names[prediction_idx]
-                    except IndexError:
-                        prediction = f"Unknown Disease (Code: {prediction_idx})"
-                    success_container = st.container()
-                    with success_container:
-                        col_a, col_b = st.columns([1, 3])
-                        with col_a:
-                            st.markdown(STETHOSCOPE_HTML, unsafe_allow_html=True)
-                        with col_b:
-                            st.success(f"**Predicted Disease:** {prediction}")
-                    st.subheader("🔍 Symptom-based Matches", divider="blue")
-                    matches = []
-                    for disease, symptoms in disease_symptoms.items():
-                        match_count = len(set(symptoms) & set(input_symptoms))
-                        if match_count:
-                            matches.append((disease, match_count, len(symptoms)))
-                    matches_sorted = sorted(
-                        matches,
-                        key=lambda x: (x[1]/x[2], x[1]),
-                        reverse=True
-                    )[:5]  
-                    for disease, count, total in matches_sorted:
-                        percentage = int((count / total) * 100)
-                        with st.expander(f"{disease} - {percentage}% match", expanded=True):
-                            st.markdown(
-                                f"""
-                                <div style="margin-bottom: 10px;">
-                                    <p><b>{count} out of {total}</b> symptoms matched</p>
-                                    <progress value="{percentage}" max="100" style="width: 100%; height: 10px;"></progress>
-                                </div>
-                                <div>
-                                    <p><b>Common symptoms:</b></p>
-                                    <ul>
-                                """,
-                                unsafe_allow_html=True
+        mode = st.radio("Input mode", ["Type symptoms", "Step by step"], horizontal=True)
+        if mode == "Step by step":
+            render_step_by_step(model, labels)
+        else:
+            with st.form("prediction_form"):
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    symptoms_input = st.text_input(
+                        'Enter your symptoms (comma separated)',
+                        'itching, skin rash, fatigue',
+                        help="Example: headache, fever, cough"
+                    )
+                with col2:
+                    st.write("") 
+                    st.write("")  
+                    submitted = st.form_submit_button(
+                        "🔍 Predict Disease",
+                        use_container_width=True
+                    )
+                if submitted:
+                    with st.spinner('Analyzing symptoms...'):
+                        METRICS.count("predict.requests")
+                        submitted_at = time.perf_counter()
+                        with METRICS.timer("predict.resolve"):
+                            input_symptoms = parse_symptoms(symptoms_input)
+                            symptom_index = load_symptom_index()
+                            symptom_keys, unmatched = symptom_index.resolve(input_symptoms)
+                        with METRICS.timer("predict.total"):
+                            result = load_prediction_cache().get_or_compute(
+                                cache_key(symptom_keys), lambda: predict_symptoms(model, labels, symptom_keys)
                             )
-                            matched_symptoms = set(disease_symptoms[disease]) & set(input_symptoms)
-                            for symptom in matched_symptoms:
-                                st.markdown(f"- ✅ {symptom}")
-                            missing_symptoms = set(disease_symptoms[disease]) - set(input_symptoms)
-                            if missing_symptoms:
-                                st.markdown("<p><b>Other symptoms to watch for:</b></p>", unsafe_allow_html=True)
-                                for symptom in missing_symptoms:
-                                    st.markdown(f"- ◻️ {symptom}")
-                            st.markdown("</ul></div>", unsafe_allow_html=True)
-                    st.markdown("---")
-                    st.subheader("📋 Recommended Actions")
-                    if len(input_symptoms) < 3:
-                        st.warning("For more accurate results, please enter at least 3 symptoms")
-                    cols = st.columns(2)
-                    with cols[0]:
-                        st.markdown("""
-                        <div class="card">
-                            <h4>🩺 Next Steps</h4>
-                            <ul>
-                                <li>Monitor your symptoms</li>
-                                <li>Note any changes in severity</li>
-                                <li>Track symptom duration</li>
-                            </ul>
-                        </div>
-                        """, unsafe_allow_html=True)
-                    with cols[1]:
-                        st.markdown("""
-                        <div class="card">
-                            <h4>⚠️ When to Seek Help</h4>
-                            <ul>
-                                <li>Difficulty breathing</li>
-                                <li>Severe pain</li>
-                                <li>Symptoms worsening</li>
-                            </ul>
-                        </div>
-                        """, unsafe_allow_html=True)
+                        prediction, risk = result['prediction'], result['risk']
+                        # With a thread pool the lookups start here and run while the diagnosis and differential
+                        # render; the default inline service only runs each one as its section is read below
+                        sections = load_recommendations().stream(prediction)
+                        success_container = st.container()
+                        with success_container:
+                            col_a, col_b = st.columns([1, 3])
+                            with col_a:
+                                st.markdown(STETHOSCOPE_HTML, unsafe_allow_html=True)
+                            with col_b:
+                                st.success(f"**Predicted Disease:** {prediction}")
+                                METRICS.observe("predict.first_result", (time.perf_counter() - submitted_at) * 1000)
+                                corrections = symptom_index.corrections(input_symptoms)
+                                if corrections:
+                                    st.info("Interpreted " + ", ".join(f"'{token}' as {key.replace('_', ' ')}" for token, key in corrections))
+                                if unmatched:
+                                    st.warning(f"Unrecognized symptoms ignored: {', '.join(unmatched)}")
+                                    suggestions = {key for token in unmatched for key, _ in symptom_index.fuzzy.candidates(token, k=3, min_similarity=0.5)}
+                                    suggestions |= {key for token in unmatched for key in symptom_index.fuzzy.complete(token, k=3)}
+                                    if suggestions:
+                                        st.caption("Did you mean: " + ", ".join(sorted(key.replace('_', ' ') for key in suggestions)))
+                                st.metric("Risk score", f"{risk['score']:g}", f"{risk['urgency']} urgency", delta_color="off")
+                                if risk['severe_symptoms']:
+                                    st.caption("Severe symptoms: " + ", ".join(s.replace('_', ' ') for s in risk['severe_symptoms']))
+                        st.subheader("🔍 Differential Diagnosis", divider="blue")
+                        st.caption("The model's prediction first, then the likeliest alternatives, with calibrated probabilities")
+                        keys = set(symptom_keys)
+                        for label, probability, count, total in result['differential']:
+                            disease = kb.diseases_by_clean_name.get(clean_disease_name(label), label)
+                            with st.expander(f"{label} - {probability:.0%}", expanded=True):
+                                st.markdown(match_html(disease, count, total, keys), unsafe_allow_html=True)
+                        st.markdown("---")
+                        st.subheader("📋 Recommended Actions")
+                        if len(input_symptoms) < 3:
+                            st.warning("For more accurate results, please enter at least 3 symptoms")
+                        cols = st.columns(2)
+                        with cols[0]:
+                            st.markdown("""
+                            <div class="card">
+                                <h4>🩺 Next Steps</h4>
+                                <ul>
+                                    <li>Monitor your symptoms</li>
+                                    <li>Note any changes in severity</li>
+                                    <li>Track symptom duration</li>
+                                </ul>
+                            </div>
+                            """, unsafe_allow_html=True)
+                        with cols[1]:
+                            st.markdown("""
+                            <div class="card">
+                                <h4>⚠️ When to Seek Help</h4>
+                                <ul>
+                                    <li>Difficulty breathing</li>
+                                    <li>Severe pain</li>
+                                    <li>Symptoms worsening</li>
+                                </ul>
+                            </div>
+                            """, unsafe_allow_html=True)
+                        st.subheader(f"💊 Recommendations for {prediction}")
+                        slots = {}
+                        for section, tab in zip(RECOMMENDATION_TABS, st.tabs(list(RECOMMENDATION_TABS.values()))):
+                            slots[section] = tab.empty()
+                            slots[section].caption("Loading...")
+                        with METRICS.timer("predict.recommendations"):
+                            for _, section, value in sections:
+                                slots[section].markdown(recommendation_markdown(section, value))
     elif page == "📋 Disease Info":
         st.markdown(DISEASE_INFO_HTML, unsafe_allow_html=True)
-        selected_disease = st.selectbox("Select a disease", sorted(disease_symptoms.keys()))
-        tab1, tab2, tab3, tab4, tab5 = st.tabs(["Symptoms", "Description", "Diet", "Medications", "Precautions"])
-        clean_selected = clean_disease_name(selected_disease)
+        selected_disease = st.selectbox("Select a disease", sorted(kb.diseases))
+        tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["Symptoms", "Description", "Diet", "Medications", "Precautions", "Workouts"])
+        with METRICS.timer("disease_info.lookup"):
+            record = load_disease_records().get(kb.clean_names[selected_disease])
+            tables = load_disease_tables().get(kb.clean_names[selected_disease], {})
         with tab1:
             st.subheader(f"Symptoms of {selected_disease}")
             if selected_disease in disease_symptoms:
-                for symptom in disease_symptoms[selected_disease]:
-                    st.markdown(f"- {symptom}")
+                st.markdown("\n".join(f"- {symptom}" for symptom in disease_symptoms[selected_disease]))
             else:
                 st.warning("No symptom information available for this disease")
         with tab2: 
-            desc_match = desc_df[desc_df['Disease'].apply(clean_disease_name) == clean_selected]
-            if not desc_match.empty:
-                st.info(desc_match['Description'].values[0])
+            if record and record.description:
+                st.info(record.description)
             else:
                 st.warning(f"No description found for: {selected_disease}")
         with tab3: 
-            diet_match = diets_df[diets_df['Disease'].apply(clean_disease_name) == clean_selected]
-            if not diet_match.empty:
-                st.dataframe(diet_match.drop(columns=['Disease']), hide_index=True)
+            if "Diet" in tables:
+                st.dataframe(tables["Diet"], hide_index=True)
             else:
                 st.warning(f"No diet info found for: {selected_disease}")
         with tab4: 
-            meds_match = meds_df[meds_df['Disease'].apply(clean_disease_name) == clean_selected]
-            if not meds_match.empty:
-                st.dataframe(meds_match.drop(columns=['Disease']), hide_index=True)
+            if "Medication" in tables:
+                st.dataframe(tables["Medication"], hide_index=True)
             else:
                 st.warning(f"No medications found for: {selected_disease}")
         with tab5: 
-            precautions_match = precautions_df[precautions_df['Disease'].apply(clean_disease_name) == clean_selected]
-            if not precautions_match.empty:
-                st.dataframe(precautions_match.drop(columns=['Disease']), hide_index=True)
+            if "Precaution" in tables:
+                st.dataframe(tables["Precaution"], hide_index=True)
             else:
                 st.warning(f"No precautions found for: {selected_disease}")
+        with tab6:
+            if "Workout" in tables:
+                st.dataframe(tables["Workout"], hide_index=True)
+            else:
+                st.warning(f"No workouts found for: {selected_disease}")
     elif page == "📊 Visualizations":
         st.title("📊 Health Insights")
+        symptom_chart, disease_chart = load_chart_specs()
         st.subheader("Symptom Frequency Chart")
-        if not symptoms_df.empty:
-            symptom_counts = symptoms_df[symptom_cols].stack().value_counts().head(10)
-            st.bar_chart(symptom_counts)
+        if symptom_chart is not None:
+            st.vega_lite_chart(spec=symptom_chart, width="stretch")
         else:
             st.warning("No symptom data available for visualization")
         st.subheader("Disease Prevalence")
-        if not symptoms_df.empty and 'Disease' in symptoms_df.columns:
-            disease_counts = symptoms_df['Disease'].value_counts().head(10)
-            st.bar_chart(disease_counts)
+        if disease_chart is not None:
+            st.vega_lite_chart(spec=disease_chart, width="stretch")
         else:
             st.warning("No disease data available for visualization")
+        for title, data, image_format in load_figures():
+            st.subheader(title)
+            st.image(data, width="stretch", output_format=image_format)
     elif page == "ℹ️ About":
         st.title("About SymptoCure")
         col1, col2 = st.columns([1, 2])
@@ -534,5 +773,6 @@ def main():
             </p>
         </div>
         """, unsafe_allow_html=True)
+    METRICS.observe(f"render.{PAGE_STAGES[page]}", (time.perf_counter() - page_start) * 1000)
 if __name__ == "__main__":
     main()
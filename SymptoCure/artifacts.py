@@ -0,0 +1,405 @@
+"""Array-backed model artifacts: export the pickles in models/ to .npy files and load them memory-mapped.
+
+    python artifacts.py export                 # every pickle in models/ -> models/artifacts/<name>/
+    python artifacts.py bench --models svc k-neighbors
+
+Each artifact directory holds meta.json (type, classes, feature names, scalar parameters), the
+model's labels.json class map, and one .npy file per array; gradient boosting's trees share one
+set of concatenated node arrays, traversed together. Arrays are opened with mmap_mode='r', so
+loading is near-instant, only the pages a prediction touches are read, and worker processes
+share them through the page cache.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import numpy as np
+# No pandas/sklearn imports at module level: loading an artifact should not pay for them
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+ARTIFACTS_DIR = os.path.join(MODELS_DIR, "artifacts")
+FORMAT_VERSION = 2
+# Rows per pass of the packed gradient-boosting traversal, bounding its (rows, trees) node matrix
+TREE_CHUNK_ROWS = 256
+def _compact(array):
+    """Store integer-valued arrays (e.g. KNN's 0/1 training matrix) as uint8 when that is lossless"""
+    array = np.asarray(array)
+    if array.dtype.kind in "biuf" and array.size and array.min() >= 0 and array.max() <= 255:
+        compact = array.astype(np.uint8)
+        if np.array_equal(compact, array):
+            return compact
+    return array
+def _tree_arrays(tree, prefix):
+    return {
+        f"{prefix}children_left": tree.children_left,
+        f"{prefix}children_right": tree.children_right,
+        f"{prefix}feature": tree.feature,
+        f"{prefix}threshold": tree.threshold,
+        f"{prefix}value": tree.value[:, 0, :],
+    }
+def _pack_trees(trees):
+    """Node arrays of many regression trees concatenated, children shifted by each tree's offset, plus the roots"""
+    roots = np.concatenate([[0], np.cumsum([tree.node_count for tree in trees])[:-1]]).astype(np.intp)
+    def children(name):
+        return np.concatenate([np.where(getattr(tree, name) != -1, getattr(tree, name) + root, -1)
+                               for tree, root in zip(trees, roots)])
+    return {
+        "children_left": children("children_left"),
+        "children_right": children("children_right"),
+        "feature": np.concatenate([tree.feature for tree in trees]),
+        "threshold": np.concatenate([tree.threshold for tree in trees]),
+        "value": np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+        "roots": roots,
+    }
+def _export_arrays(model):
+    kind = type(model).__name__
+    if kind == "SVC":
+        if model.kernel == "linear":
+            arrays, params = {"coef": model.coef_, "intercept": model.intercept_}, {"kernel": "linear"}
+        elif model.kernel == "rbf":
+            arrays = {"support_vectors": model.support_vectors_, "dual_coef": model.dual_coef_,
+                      "intercept": model.intercept_, "n_support": model.n_support_}
+            params = {"kernel": "rbf", "gamma": float(model._gamma)}
+        else:
+            raise NotImplementedError(f"SVC kernel {model.kernel!r} is not supported")
+        if model.probability:
+            arrays.update(prob_a=model.probA_, prob_b=model.probB_)
+        params["probability"] = bool(model.probability)
+        return arrays, params
+    if kind == "LogisticRegression":
+        return {"coef": model.coef_, "intercept": model.intercept_}, {}
+    if kind == "MultinomialNB":
+        return {"feature_log_prob": model.feature_log_prob_, "class_log_prior": model.class_log_prior_}, {}
+    if kind == "DecisionTreeClassifier":
+        return _tree_arrays(model.tree_, ""), {}
+    if kind == "KNeighborsClassifier":
+        if model.weights != "uniform" or model.effective_metric_ not in ("euclidean", "minkowski"):
+            raise NotImplementedError("only uniform-weight euclidean KNN is supported")
+        return {"fit_X": _compact(model._fit_X), "y": model._y}, {"n_neighbors": int(model.n_neighbors)}
+    if kind == "GradientBoostingClassifier":
+        # Stage-major: tree s * n_outputs + k is stage s, output k
+        arrays = _pack_trees([estimator.tree_ for estimator in model.estimators_.ravel()])
+        # Raw score of the init estimator is constant for the default 'prior' init
+        arrays["init_raw"] = model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0]
+        return arrays, {"n_stages": len(model.estimators_), "n_outputs": model.estimators_.shape[1],
+                        "learning_rate": float(model.learning_rate)}
+    raise NotImplementedError(f"{kind} has no array export")
+def export_model(model, out_dir):
+    """Write model as meta.json + .npy arrays into out_dir"""
+    os.makedirs(out_dir, exist_ok=True)
+    kind = type(model).__name__
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "type": kind,
+        "classes": np.asarray(model.classes_).tolist(),
+        "feature_names": [str(f) for f in model.feature_names_in_],
+    }
+    if kind == "XGBClassifier":
+        # XGBoost's own binary format is pickle-free and loads without sklearn
+        model.get_booster().save_model(os.path.join(out_dir, "booster.ubj"))
+        meta["params"] = {}
+    else:
+        arrays, meta["params"] = _export_arrays(model)
+        for name, array in arrays.items():
+            np.save(os.path.join(out_dir, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    return meta
+def softmax(scores):
+    scores = scores - scores.max(axis=1, keepdims=True)
+    np.exp(scores, out=scores)
+    return scores / scores.sum(axis=1, keepdims=True)
+def ovr_decision(dec, n_classes, as_predict=False):
+    """sklearn's one-vs-rest SVC scores from one-vs-one ones (votes plus squashed confidence), vectorized.
+
+    With as_predict=True the votes are counted as libsvm's predict counts them (a zero pairwise score
+    votes for the second class) and the lowest-index class among tied top votes is lifted above the
+    rest, so the row-wise argmax is the prediction.
+    """
+    i, j = np.triu_indices(n_classes, 1)
+    eye = np.eye(n_classes)
+    first, second = eye[i], eye[j]
+    wins = dec > 0 if as_predict else dec >= 0
+    votes = wins @ first + ~wins @ second
+    confidence = dec @ first - dec @ second
+    scores = votes + confidence / (3 * (np.abs(confidence) + 1))
+    if as_predict:
+        scores[np.arange(len(scores)), votes.argmax(axis=1)] = votes.max(axis=1) + 0.5
+    return scores
+class ArrayModel:
+    """Prediction from memory-mapped arrays; mirrors predict/predict_proba of the exported estimator"""
+    def __init__(self, path, meta):
+        self.path = path
+        self.meta = meta
+        self.classes_ = np.asarray(meta["classes"])
+        self.feature_names_in_ = np.asarray(meta["feature_names"], dtype=object)
+        self.params = meta["params"]
+        self._arrays = {}
+    def _array(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return array
+    def predict(self, X):
+        return self.classes_[self.decision(np.asarray(X, dtype=np.float64)).argmax(axis=1)]
+    def predict_proba(self, X):
+        return softmax(self.decision(np.asarray(X, dtype=np.float64)))
+    def decision(self, X):
+        raise NotImplementedError
+class LinearArrayModel(ArrayModel):
+    def decision(self, X):
+        return X @ self._array("coef").T + self._array("intercept")
+class NaiveBayesArrayModel(ArrayModel):
+    def decision(self, X):
+        return X @ self._array("feature_log_prob").T + self._array("class_log_prior")
+class SVCArrayModel(ArrayModel):
+    decision_function_shape = "ovr"
+    def _pairwise(self, X):
+        if self.params["kernel"] == "linear":
+            return X @ self._array("coef").T + self._array("intercept")
+        sv = self._array("support_vectors")
+        dual = self._array("dual_coef")
+        n_support = self._array("n_support")
+        sq = (X ** 2).sum(axis=1)[:, None] - 2 * X @ sv.T + (np.asarray(sv) ** 2).sum(axis=1)
+        kernel = np.exp(-self.params["gamma"] * sq)
+        starts = np.concatenate([[0], np.cumsum(n_support)])
+        n_classes = len(n_support)
+        dec = []
+        for i in range(n_classes):
+            for j in range(i + 1, n_classes):
+                si, sj = slice(starts[i], starts[i + 1]), slice(starts[j], starts[j + 1])
+                dec.append(kernel[:, si] @ dual[j - 1, si] + kernel[:, sj] @ dual[i, sj])
+        return np.stack(dec, axis=1) + self._array("intercept")
+    def decision(self, X):
+        # One-vs-one voting as in libsvm: a positive pairwise score votes for the first class.
+        # Scores come from the primal coef_, so a pair whose score is ~0 (both classes equally
+        # likely) can vote differently from libsvm's dual evaluation; that only changes exact ties.
+        positive = self._pairwise(X) > 0
+        first, second = self._vote_matrices()
+        return positive @ first + ~positive @ second
+    def decision_function(self, X):
+        dec = self._pairwise(np.asarray(X, dtype=np.float64))
+        return dec if self.decision_function_shape == "ovo" else ovr_decision(dec, len(self.classes_))
+    def _vote_matrices(self):
+        # Pair p = (i, j) in libsvm order; row p of `first` is one-hot for i, of `second` for j
+        if "vote_first" not in self._arrays:
+            n_classes = len(self.classes_)
+            i, j = np.triu_indices(n_classes, 1)
+            eye = np.eye(n_classes)
+            self._arrays["vote_first"], self._arrays["vote_second"] = eye[i], eye[j]
+        return self._arrays["vote_first"], self._arrays["vote_second"]
+    def _pairwise_coupling(self, dec):
+        """libsvm's multiclass_probability, vectorised over rows"""
+        n, k = len(dec), len(self.classes_)
+        f = dec * self._array("prob_a") + self._array("prob_b")
+        pairwise = np.where(f >= 0, np.exp(-np.abs(f)) / (1 + np.exp(-np.abs(f))), 1 / (1 + np.exp(-np.abs(f))))
+        pairwise = np.clip(pairwise, 1e-7, 1 - 1e-7)
+        r = np.zeros((n, k, k))
+        i, j = np.triu_indices(k, 1)
+        r[:, i, j] = pairwise
+        r[:, j, i] = 1 - pairwise
+        Q = -r.transpose(0, 2, 1) * r
+        diag = np.arange(k)
+        Q[:, diag, diag] = (r ** 2).sum(axis=1) - r[:, diag, diag] ** 2
+        p = np.full((n, k), 1.0 / k)
+        active = np.ones(n, dtype=bool)
+        eps = 0.005 / k
+        for _ in range(max(100, k)):
+            Qa, pa = Q[active], p[active]
+            Qp = np.einsum("ntj,nj->nt", Qa, pa)
+            pQp = (pa * Qp).sum(axis=1)
+            converged = np.abs(Qp - pQp[:, None]).max(axis=1) < eps
+            rows = np.flatnonzero(active)
+            active[rows[converged]] = False
+            if not active.any():
+                break
+            Qa, pa, Qp, pQp = Qa[~converged], pa[~converged], Qp[~converged], pQp[~converged]
+            for t in range(k):
+                diff = (-Qp[:, t] + pQp) / Qa[:, t, t]
+                pa[:, t] += diff
+                pQp = (pQp + diff * (diff * Qa[:, t, t] + 2 * Qp[:, t])) / (1 + diff) ** 2
+                Qp = (Qp + diff[:, None] * Qa[:, t, :]) / (1 + diff)[:, None]
+                pa /= (1 + diff)[:, None]
+            p[active] = pa
+        return p
+    def predict_proba(self, X):
+        if not self.params.get("probability"):
+            raise NotImplementedError("SVC was trained without probability=True")
+        return self._pairwise_coupling(self._pairwise(np.asarray(X, dtype=np.float64)))
+def _tree_leaves(left, right, feature, threshold, X, roots=(0,)):
+    """Leaf reached by each row of X in each tree starting at roots, shape (rows, trees)"""
+    node = np.tile(np.asarray(roots, dtype=np.intp), (len(X), 1))
+    rows = np.broadcast_to(np.arange(len(X))[:, None], node.shape)
+    active = left[node] != -1
+    while active.any():
+        n = node[active]
+        go_left = X[rows[active], feature[n]] <= threshold[n]
+        node[active] = np.where(go_left, left[n], right[n])
+        active = left[node] != -1
+    return node
+class TreeArrayModel(ArrayModel):
+    def _leaves(self, X, roots=(0,)):
+        a = self._array
+        return _tree_leaves(a("children_left"), a("children_right"), a("feature"), a("threshold"), X, roots)
+    def decision(self, X):
+        values = self._array("value")[self._leaves(X)[:, 0]]
+        return values / values.sum(axis=1, keepdims=True)
+    def predict_proba(self, X):
+        return self.decision(np.asarray(X, dtype=np.float64))
+class GradientBoostingArrayModel(TreeArrayModel):
+    def decision(self, X):
+        # Every tree at once over the packed node arrays, a chunk of rows at a time
+        n_outputs = self.params["n_outputs"]
+        roots, value = self._array("roots"), self._array("value")
+        raw = np.empty((len(X), n_outputs))
+        for start in range(0, len(X), TREE_CHUNK_ROWS):
+            chunk = X[start:start + TREE_CHUNK_ROWS]
+            raw[start:start + len(chunk)] = value[self._leaves(chunk, roots)].reshape(len(chunk), -1, n_outputs).sum(axis=1)
+        return self._array("init_raw") + self.params["learning_rate"] * raw
+    def predict(self, X):
+        raw = self.decision(np.asarray(X, dtype=np.float64))
+        if raw.shape[1] == 1:
+            return self.classes_[(raw[:, 0] > 0).astype(int)]
+        return self.classes_[raw.argmax(axis=1)]
+    def predict_proba(self, X):
+        raw = self.decision(np.asarray(X, dtype=np.float64))
+        if raw.shape[1] == 1:
+            p = 1 / (1 + np.exp(-raw[:, 0]))
+            return np.column_stack([1 - p, p])
+        return softmax(raw)
+class KNeighborsArrayModel(ArrayModel):
+    def decision(self, X):
+        fit_X = self._array("fit_X")
+        y = self._array("y")
+        k = self.params["n_neighbors"]
+        fit_sq = (np.asarray(fit_X, dtype=np.float64) ** 2).sum(axis=1)
+        distances = (X ** 2).sum(axis=1)[:, None] - 2 * (X @ fit_X.T) + fit_sq
+        neighbors = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        votes = np.zeros((len(X), len(self.classes_)))
+        np.add.at(votes, (np.arange(len(X))[:, None], y[neighbors]), 1)
+        return votes
+    def predict_proba(self, X):
+        votes = self.decision(np.asarray(X, dtype=np.float64))
+        return votes / votes.sum(axis=1, keepdims=True)
+class XGBoostArtifact(ArrayModel):
+    def _booster(self):
+        booster = self._arrays.get("booster")
+        if booster is None:
+            import xgboost
+            booster = self._arrays["booster"] = xgboost.Booster(model_file=os.path.join(self.path, "booster.ubj"))
+        return booster
+    def predict_proba(self, X):
+        import xgboost
+        data = xgboost.DMatrix(np.asarray(X, dtype=np.float32), feature_names=list(self.feature_names_in_))
+        return self._booster().predict(data)
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+ARTIFACT_TYPES = {
+    "SVC": SVCArrayModel,
+    "LogisticRegression": LinearArrayModel,
+    "MultinomialNB": NaiveBayesArrayModel,
+    "DecisionTreeClassifier": TreeArrayModel,
+    "GradientBoostingClassifier": GradientBoostingArrayModel,
+    "KNeighborsClassifier": KNeighborsArrayModel,
+    "XGBClassifier": XGBoostArtifact,
+}
+def load_artifact(path):
+    """Open an exported model directory; arrays are mapped lazily on first use"""
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported artifact format {meta.get('format_version')}")
+    return ARTIFACT_TYPES[meta["type"]](path, meta)
+class ArtifactRegistry:
+    """Opens each artifact the first time a request asks for it, then keeps it"""
+    def __init__(self, artifacts_dir=ARTIFACTS_DIR):
+        self.artifacts_dir = artifacts_dir
+        self._models = {}
+        self._lock = threading.Lock()
+    def available(self):
+        if not os.path.isdir(self.artifacts_dir):
+            return []
+        return sorted(d for d in os.listdir(self.artifacts_dir)
+                      if os.path.exists(os.path.join(self.artifacts_dir, d, "meta.json")))
+    def get(self, name):
+        model = self._models.get(name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(name)
+                if model is None:
+                    model = self._models[name] = load_artifact(os.path.join(self.artifacts_dir, name))
+        return model
+def export_all(names=None, models_dir=MODELS_DIR, artifacts_dir=ARTIFACTS_DIR):
+    from class_map import class_map_path
+    from loaders import read_model
+    names = names or sorted(os.path.splitext(f)[0] for f in os.listdir(models_dir) if f.endswith(".pkl"))
+    for name in names:
+        try:
+            model_path = os.path.join(models_dir, f"{name}.pkl")
+            out_dir = os.path.join(artifacts_dir, name)
+            meta = export_model(read_model(model_path), out_dir)
+            if os.path.exists(class_map_path(model_path)):
+                shutil.copyfile(class_map_path(model_path), class_map_path(out_dir))
+            print(f"exported {name} ({meta['type']})")
+        except NotImplementedError as exc:
+            print(f"skipped {name}: {exc}", file=sys.stderr)
+# Source of the resident-memory probe that the benchmark child processes here and in evaluate.py define
+RSS_MB_SOURCE = """
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS'):
+                return int(line.split()[1]) / 1024
+"""
+_BENCH_CHILD = r"""
+import json, os, sys, time
+import numpy as np
+{rss_mb}
+sys.path.insert(0, {base!r})
+kind, path = sys.argv[1], sys.argv[2]
+before = rss_mb()
+start = time.perf_counter()
+if kind == 'pickle':
+    from loaders import read_model as load
+else:
+    from artifacts import load_artifact as load
+model = load(path)
+loaded = time.perf_counter() - start
+X = np.zeros((1, len(model.feature_names_in_)))
+X[0, :3] = 1
+model.predict(X)
+ready = time.perf_counter() - start
+print(json.dumps({{'load_s': loaded, 'first_predict_s': ready, 'rss_delta_mb': rss_mb() - before}}))
+"""
+def bench(names=None, models_dir=MODELS_DIR, artifacts_dir=ARTIFACTS_DIR):
+    """Cold start (fresh process, imports included) and resident-memory growth, pickle vs artifact"""
+    base = os.path.dirname(os.path.abspath(__file__))
+    child = _BENCH_CHILD.format(base=base, rss_mb=RSS_MB_SOURCE)
+    registry = ArtifactRegistry(artifacts_dir)
+    names = names or registry.available()
+    print(f"{'model':<22} {'format':<9} {'load ms':>9} {'ready ms':>9} {'RSS +MB':>8}")
+    for name in names:
+        for kind, path in (("pickle", os.path.join(models_dir, f"{name}.pkl")),
+                           ("artifact", os.path.join(artifacts_dir, name))):
+            proc = subprocess.run([sys.executable, "-c", child, kind, path], capture_output=True, text=True)
+            if proc.returncode:
+                print(f"{name:<22} {kind:<9} failed: {proc.stderr.strip().splitlines()[-1]}")
+                continue
+            r = json.loads(proc.stdout)
+            print(f"{name:<22} {kind:<9} {r['load_s'] * 1000:>9.1f} {r['first_predict_s'] * 1000:>9.1f} "
+                  f"{r['rss_delta_mb']:>8.1f}")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["export", "bench"])
+    parser.add_argument("--models", nargs="*", default=None, help="model names (default: all)")
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--artifacts-dir", default=ARTIFACTS_DIR)
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        export_all(args.models, args.models_dir, args.artifacts_dir)
+    else:
+        bench(args.models, args.models_dir, args.artifacts_dir)
+if __name__ == "__main__":
+    main()
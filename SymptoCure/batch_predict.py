@@ -0,0 +1,209 @@
+"""Headless batch prediction over CSV or JSONL files of symptom lists.
+
+Examples:
+    python batch_predict.py patients.csv -o predictions.jsonl
+    python batch_predict.py patients.jsonl --model models/logistic_regression.pkl --top-k 3
+    python batch_predict.py patients.jsonl --ensemble svc,logistic_regression,xgboost --ensemble-method proba
+    python batch_predict.py patients.jsonl --differential 5 --recommendations
+    cat patients.jsonl | python batch_predict.py - --format jsonl
+
+CSV input uses a comma separated ``symptoms`` column, or the Symptom_1..Symptom_n columns
+when there is none (e.g. datasets/symtoms_df.csv). JSONL lines are objects with ``symptoms``
+(list or comma separated string) and an optional ``id``, or bare lists. Rows without an id get
+"line-N" (JSONL) or "row-N" (CSV), 1-based, which can't collide with numeric ids in the file.
+A null ``symptoms`` counts as none; lines that aren't JSON or whose symptoms have another type
+are reported on stderr with their line number and skipped.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+import warnings
+import numpy as np
+from class_map import decode, load_class_map, validate_class_map
+from differential import DifferentialDiagnoser
+from ensemble import Ensemble, add_ensemble_arguments, ensemble_from_args
+from knowledge_base import build_disease_records, build_knowledge_base
+from kb_bundle import load_bundle
+from loaders import DATA_DIR, MODEL_PATH, read_model
+from matching import SymptomMatcher
+from metrics import METRICS
+from recommendations import RecommendationService
+from risk import RiskScorer
+from symptom_index import SymptomIndex, parse_symptoms
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+class BatchPredictor:
+    """Model, symptom index and matcher loaded once, applied to chunks of rows"""
+    def __init__(self, model, labels, kb, symptom_index, risk=None, records=None, training=None):
+        self.model = model
+        self.labels = labels
+        self.kb = kb
+        self.index = symptom_index
+        self.matcher = SymptomMatcher.from_knowledge_base(kb)
+        self.differential = DifferentialDiagnoser(model, labels, kb, self.matcher)
+        # (X, y) to calibrate the differential on, the first time one is requested
+        self._calibration = training
+        self.risk = risk if risk is not None else RiskScorer(np.zeros(len(symptom_index.feature_names)), symptom_index.feature_names)
+        self.records = records
+        self.recommendations = RecommendationService.from_records(records) if records is not None else None
+    @classmethod
+    def from_paths(cls, model_path=MODEL_PATH, data_dir=DATA_DIR, model=None):
+        bundle = load_bundle(data_dir)
+        data = bundle.frames()
+        model = model if model is not None else read_model(model_path)
+        labels_path = next(iter(model.paths.values())) if isinstance(model, Ensemble) else model_path
+        labels = load_class_map(labels_path)
+        validate_class_map(model, labels, os.path.join(data_dir, 'Training.csv'), bundle)
+        severity_df = data['symptom_severity']
+        index = SymptomIndex(model.feature_names_in_, severity_df['Symptom'].tolist(), fuzzy=True)
+        X, y, _, _ = bundle.training()
+        return cls(model, labels, build_knowledge_base(data['symptoms_df']), index,
+                   RiskScorer.from_severity(index, severity_df), build_disease_records(data), (X, y))
+    def _calibrated_differential(self):
+        if self._calibration is not None:
+            with METRICS.timer("batch.calibrate"):
+                self.differential.calibrate(*self._calibration)
+            self._calibration = None
+        return self.differential
+    def predict_chunk(self, token_lists, top_k=5, differential_k=0, recommendations=False):
+        with METRICS.timer("batch.resolve"):
+            resolved = [self.index.resolve(tokens) for tokens in token_lists]
+            keys = [row_keys for row_keys, _ in resolved]
+        with METRICS.timer("batch.vectorize"):
+            X, _ = self.index.vectorize_many(keys, dense=True)
+        differentials = [None] * len(token_lists)
+        if differential_k:
+            # The prediction is the differential's first entry, from the same model pass
+            with METRICS.timer("batch.differential"):
+                differentials = self._calibrated_differential().rank_batch(X, keys, differential_k)
+            names = np.array([row[0].disease for row in differentials], dtype=object)
+        else:
+            with METRICS.timer("batch.model"):
+                names = decode(self.labels, self.model.predict(X))
+        risks = self.risk.assess_many(X, names, self.records)
+        with METRICS.timer("batch.rank"):
+            matches = self.matcher.rank_batch(keys, top_k)
+        payloads = {}
+        if recommendations and self.recommendations is not None:
+            with METRICS.timer("batch.recommendations"):
+                payloads = self.recommendations.fetch_batch(names)
+        METRICS.count("batch.rows", len(token_lists))
+        for name, risk, row_matches, (_, dropped), differential in zip(names, risks, matches, resolved, differentials):
+            result = {
+                'prediction': name,
+                'matches': [{'disease': d, 'matched': c, 'total': t} for d, c, t in row_matches],
+                'risk_score': risk.score,
+                'urgency': risk.urgency,
+                'severe_symptoms': list(risk.severe_symptoms),
+                'precautions': list(risk.precautions),
+                'unmatched': dropped,
+            }
+            if differential is not None:
+                result['differential'] = [entry._asdict() for entry in differential]
+            if name in payloads:
+                result['recommendations'] = payloads[name]
+            yield result
+def read_rows(stream, fmt, symptom_column='symptoms', id_column='id'):
+    """Yield (row id, symptom tokens) without holding the file in memory"""
+    if fmt == 'jsonl':
+        for n, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                print(f"line {n}: skipped, not JSON ({exc})", file=sys.stderr)
+                continue
+            row_id, symptoms = f"line-{n}", record
+            if isinstance(record, dict):
+                row_id, symptoms = record.get(id_column, row_id), record.get(symptom_column)
+            # One bad record shouldn't abort a long run: null means no symptoms, other types are skipped
+            if symptoms is None:
+                symptoms = []
+            if not isinstance(symptoms, (str, list)):
+                print(f"line {n}: skipped, symptoms must be a list or a string, not {type(symptoms).__name__}", file=sys.stderr)
+                continue
+            yield row_id, parse_symptoms(symptoms)
+        return
+    reader = csv.DictReader(stream)
+    columns = reader.fieldnames or []
+    if symptom_column not in columns:
+        symptom_columns = [c for c in columns if c.startswith('Symptom_')]
+        if not symptom_columns:
+            raise ValueError(f"CSV needs a '{symptom_column}' column or Symptom_N columns")
+    for n, row in enumerate(reader, 1):
+        row_id = row.get(id_column) or f"row-{n}"
+        if symptom_column in columns:
+            yield row_id, parse_symptoms(row[symptom_column] or '')
+        else:
+            yield row_id, parse_symptoms(row[c] for c in symptom_columns)
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+def run(predictor, rows, out, chunk_size=10000, top_k=5, differential_k=0, recommendations=False):
+    """Stream predictions for rows to out as JSON lines; return summary stats"""
+    n_rows = n_tokens = n_dropped = 0
+    start = time.perf_counter()
+    for chunk in chunked(rows, chunk_size):
+        ids, token_lists = zip(*chunk)
+        for row_id, result in zip(ids, predictor.predict_chunk(token_lists, top_k, differential_k, recommendations)):
+            out.write(json.dumps({'id': row_id, **result}) + '\n')
+            n_dropped += len(result['unmatched'])
+        n_rows += len(chunk)
+        n_tokens += sum(len(tokens) for tokens in token_lists)
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': n_rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_sec': round(n_rows / elapsed, 1) if elapsed else None,
+        'drop_rate': round(n_dropped / n_tokens, 4) if n_tokens else 0.0,
+    }
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('input', help="CSV or JSONL file, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="JSONL output file, '-' for stdout")
+    parser.add_argument('--format', choices=['auto', 'csv', 'jsonl'], default='auto')
+    parser.add_argument('--model', default=MODEL_PATH, help="any pickled model from models/")
+    add_ensemble_arguments(parser)
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--symptom-column', default='symptoms')
+    parser.add_argument('--id-column', default='id')
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--differential', type=int, default=0, metavar='K',
+                        help="also output the top-K differential diagnosis with probabilities (see differential.py)")
+    parser.add_argument('--recommendations', action='store_true',
+                        help="also output the predicted disease's description, diets, medications, precautions and workouts")
+    args = parser.parse_args(argv)
+    fmt = args.format
+    if fmt == 'auto':
+        fmt = 'jsonl' if args.input.endswith(('.jsonl', '.json', '.ndjson')) else 'csv'
+    load_start = time.perf_counter()
+    predictor = BatchPredictor.from_paths(args.model, args.data_dir, ensemble_from_args(args))
+    load_seconds = time.perf_counter() - load_start
+    source = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    try:
+        rows = read_rows(source, fmt, args.symptom_column, args.id_column)
+        summary = run(predictor, rows, out, args.chunk_size, args.top_k, args.differential, args.recommendations)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            out.close()
+    model_name = f"ensemble[{','.join(predictor.model.models)}]" if args.ensemble else os.path.basename(args.model)
+    summary = {'model': model_name, 'load_seconds': round(load_seconds, 3), **summary}
+    if args.ensemble:
+        summary['members'] = {
+            name: {**stats, 'seconds': round(stats['seconds'], 3)} for name, stats in predictor.model.stats.items()
+        }
+    print(json.dumps(summary), file=sys.stderr)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Top-1/top-k accuracy, calibration and latency of the differential diagnosis on perturbed Training.csv rows.
+
+Run from the SymptoCure directory:  python benchmarks/bench_differential.py --rows 2000 --dropout 0.4
+
+Rows have symptoms dropped (as patients under-report) so the task isn't trivially in-sample; the
+default seed differs from the one calibrate() samples with. ECE is the expected calibration
+error of the top probability, for the model's own predict_proba and for the first entry of the
+calibrated differential.
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+import warnings
+import numpy as np
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+from batch_predict import BatchPredictor
+from differential import top_k_indices
+from kb_bundle import load_bundle
+from loaders import MODEL_PATH
+from perturbation import perturb
+def expected_calibration_error(confidence, correct, bins=10):
+    edges = np.linspace(0, 1, bins + 1)
+    which = np.clip(np.digitize(confidence, edges) - 1, 0, bins - 1)
+    error = 0.0
+    for b in range(bins):
+        mask = which == b
+        if mask.any():
+            error += mask.mean() * abs(confidence[mask].mean() - correct[mask].mean())
+    return error
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--dropout", type=float, default=0.4)
+    parser.add_argument("--noise", type=int, default=0)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+    predictor = BatchPredictor.from_paths(args.model)
+    X_all, y_all, _, features = load_bundle().training()
+    start = time.perf_counter()
+    diagnoser = predictor.differential.calibrate(X_all, y_all)
+    print(f"calibration: temperature {diagnoser.temperature:.3g}, fitted in {time.perf_counter() - start:.2f}s")
+    rng = np.random.default_rng(args.seed)
+    rows = rng.choice(len(X_all), size=min(args.rows, len(X_all)), replace=False)
+    X = perturb(X_all[rows], rng, dropout=args.dropout, noise=args.noise).astype(np.float64)
+    keys = [[k for k in (predictor.index.key_for(features[c]) for c in np.flatnonzero(row)) if k] for row in X]
+    truth = np.asarray(predictor.labels)[y_all[rows]]
+    predicted = np.asarray(predictor.labels)[predictor.model.predict(X)]
+    start = time.perf_counter()
+    ranked = diagnoser.rank_batch(X, keys, args.k)
+    batch_us = (time.perf_counter() - start) / len(X) * 1e6
+    top = np.array([[entry.disease for entry in row] for row in ranked])
+    correct = top[:, 0] == truth
+    print(f"model.predict       top-1 {np.mean(predicted == truth):.3f}")
+    print(f"differential        top-1 {correct.mean():.3f}  top-{args.k} {np.mean([t in r for t, r in zip(truth, top)]):.3f}"
+          f"  first entry == predict on {np.mean(top[:, 0] == predicted):.1%} of rows")
+    if hasattr(predictor.model, "predict_proba"):
+        raw = np.asarray(predictor.model.predict_proba(X))
+        raw_correct = np.asarray(predictor.labels)[predictor.model.classes_[raw.argmax(axis=1)]] == truth
+        print(f"predict_proba argmax top-1 {raw_correct.mean():.3f}  ECE {expected_calibration_error(raw.max(axis=1), raw_correct):.3f}")
+    calibrated = np.array([row[0].probability for row in ranked])
+    print(f"differential first entry  ECE {expected_calibration_error(calibrated, correct):.3f}"
+          f"  (mean confidence {calibrated.mean():.3f} vs accuracy {correct.mean():.3f})")
+    start = time.perf_counter()
+    for i in range(200):
+        diagnoser.rank(X[i], keys[i], args.k)
+    single_us = (time.perf_counter() - start) / 200 * 1e6
+    scores = rng.random((len(X), len(predictor.labels)))
+    partial = timeit.timeit(lambda: top_k_indices(scores, args.k), number=50) / 50
+    full = timeit.timeit(lambda: np.argsort(-scores, axis=1, kind="stable")[:, :args.k], number=50) / 50
+    print(f"rank: {single_us:.0f} us single row, {batch_us:.1f} us/row batched; top-{args.k} of {scores.shape[1]} classes "
+          f"for {len(X)} rows: argpartition {partial * 1e3:.2f} ms vs full argsort {full * 1e3:.2f} ms")
+if __name__ == "__main__":
+    main()
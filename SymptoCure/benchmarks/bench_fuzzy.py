@@ -0,0 +1,78 @@
+"""Resolution accuracy and lookups/sec of symptom typo correction over a generated noisy corpus.
+
+Run from the SymptoCure directory:  python benchmarks/bench_fuzzy.py --samples 5000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+from symptom_index import SymptomIndex
+def _typo(rng, word):
+    i = rng.randrange(len(word))
+    op = rng.choice(["delete", "insert", "substitute", "swap"])
+    if op == "delete" and len(word) > 3:
+        return word[:i] + word[i + 1:]
+    if op == "insert":
+        return word[:i] + rng.choice(string.ascii_lowercase) + word[i:]
+    if op == "swap" and i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(string.ascii_lowercase) + word[i + 1:]
+def noisy_variant(rng, key):
+    """A user-style rendering of key: separator/case changes, then (usually) one typo"""
+    text = key.replace("_", rng.choice([" ", "", "_", "  "]))
+    text = rng.choice([str.lower, str.title, str.upper, str.capitalize])(text)
+    if rng.random() < 0.8:
+        text = _typo(rng, text)
+    return f"{' ' * rng.randint(0, 1)}{text}{' ' * rng.randint(0, 1)}"
+def junk(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 12)))
+def measure(index, corpus, junk_tokens):
+    correct = wrong = missed = 0
+    start = time.perf_counter()
+    for token, expected in corpus:
+        key = index.key_for(token)
+        if key == expected:
+            correct += 1
+        elif key is None:
+            missed += 1
+        else:
+            wrong += 1
+    elapsed = time.perf_counter() - start
+    false_hits = sum(index.key_for(token) is not None for token in junk_tokens)
+    n = len(corpus)
+    return {
+        "accuracy": round(correct / n, 4),
+        "wrong": round(wrong / n, 4),
+        "unresolved": round(missed / n, 4),
+        "junk_accepted": round(false_hits / len(junk_tokens), 4),
+        "lookups_per_sec": round(n / elapsed),
+        "us_per_lookup": round(elapsed / n * 1e6, 1),
+    }
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    training = os.path.join(APP_DIR, "datasets", "Training.csv")
+    severity = os.path.join(APP_DIR, "datasets", "Symptom-severity.csv")
+    rng = random.Random(args.seed)
+    keys = sorted(set(SymptomIndex.from_files(training, severity).canonical.values()))
+    corpus = [(noisy_variant(rng, key), key) for key in (rng.choice(keys) for _ in range(args.samples))]
+    junk_tokens = [junk(rng) for _ in range(1000)]
+    for label, fuzzy in (("exact only", False), ("with typo correction", True)):
+        # A fresh index per run so the token cache starts cold; only repeated tokens hit it
+        index = SymptomIndex.from_files(training, severity, fuzzy=fuzzy)
+        print(f"{label:22s} {measure(index, corpus, junk_tokens)}")
+    resolver = index.fuzzy
+    start = time.perf_counter()
+    for token, _ in corpus:
+        resolver.correct(token)
+    elapsed = time.perf_counter() - start
+    uncached = {"lookups_per_sec": round(len(corpus) / elapsed), "us_per_lookup": round(elapsed / len(corpus) * 1e6, 1)}
+    print(f"{'resolver.correct':22s} {uncached}")
+if __name__ == "__main__":
+    main()
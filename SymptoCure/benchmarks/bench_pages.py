@@ -0,0 +1,59 @@
+"""Server CPU and bytes sent per rerun for each Streamlit page, measured headlessly with AppTest.
+
+Run from the SymptoCure directory:  python benchmarks/bench_pages.py --reruns 20
+
+Bytes are the serialized size of every element and block message the rerun produces, which is
+what the server pushes over the websocket. Images shown with st.image are not included: they
+are served separately by URL and cached by the browser. CPU and wall time cover the whole
+rerun including Streamlit's and AppTest's own overhead; page_ms is the app's render.<page>
+stage timing from metrics.py.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+from streamlit.testing.v1 import AppTest
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+from metrics import METRICS
+PAGES = {"🏠 Welcome": "welcome", "🔍 Predict Disease": "predict", "📋 Disease Info": "disease_info",
+         "📊 Visualizations": "visualizations"}
+def payload_bytes(node):
+    proto = getattr(node, "proto", None)
+    size = proto.ByteSize() if hasattr(proto, "ByteSize") else 0
+    return size + sum(payload_bytes(child) for child in getattr(node, "children", {}).values())
+def rerun(at, page):
+    if page == "🔍 Predict Disease":
+        at.button[0].click()
+    start_cpu, start_wall = time.process_time(), time.perf_counter()
+    at.run()
+    return time.process_time() - start_cpu, time.perf_counter() - start_wall
+def measure(page, reruns):
+    at = AppTest.from_file(os.path.join(APP_DIR, "app.py"), default_timeout=120)
+    at.run()
+    at.sidebar.radio[0].set_value(page)
+    at.run()
+    # One warm rerun so st.cache_* and the prediction cache are populated
+    rerun(at, page)
+    METRICS.reset()
+    cpu, wall = zip(*(rerun(at, page) for _ in range(reruns)))
+    if at.exception:
+        raise RuntimeError(f"{page}: {at.exception[0].message}")
+    return {
+        "cpu_ms": round(statistics.median(cpu) * 1000, 2),
+        "wall_ms": round(statistics.median(wall) * 1000, 2),
+        "page_ms": METRICS.snapshot()["stages"][f"render.{PAGES[page]}"]["mean_ms"],
+        "bytes": payload_bytes(at._tree),
+    }
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+    os.chdir(APP_DIR)
+    for page in PAGES:
+        print(f"{page:22s} {measure(page, args.reruns)}")
+if __name__ == "__main__":
+    main()
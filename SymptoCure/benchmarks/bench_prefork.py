@@ -0,0 +1,119 @@
+"""Startup time and per-worker memory of N independent servers versus one preforked server.
+
+Run from the SymptoCure directory:  python benchmarks/bench_prefork.py --workers 4
+
+Each layout is started from scratch, timed until every worker answers GET /ready, measured,
+put under load with loadgen.py, then measured again (copy-on-write pages a worker touches
+stop being shared). RSS counts shared pages in full for every process; PSS splits them between
+the processes sharing them, so the PSS total is the real memory cost of the layout.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from loadgen import run_level
+def memory_mb(pid):
+    """Rss, Pss and private (USS) memory of one process from /proc/<pid>/smaps_rollup"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "uss": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+def children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(child) for child in f.read().split()]
+    except OSError:
+        return []
+def ready_pid(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+    try:
+        conn.request("GET", "/ready")
+        response = conn.getresponse()
+        body = json.loads(response.read())
+        return body["pid"] if response.status == 200 else None
+    except (OSError, http.client.HTTPException, ValueError):
+        return None
+    finally:
+        conn.close()
+def wait_ready(ports, expected_pids, timeout=120):
+    """Poll /ready until expected_pids distinct workers have answered; return elapsed seconds"""
+    start = time.perf_counter()
+    seen = set()
+    while len(seen) < expected_pids:
+        if time.perf_counter() - start > timeout:
+            raise TimeoutError(f"only {len(seen)} of {expected_pids} workers became ready")
+        for port in ports:
+            pid = ready_pid(port)
+            if pid is not None:
+                seen.add(pid)
+        time.sleep(0.01)
+    return time.perf_counter() - start
+def launch(args, port):
+    return subprocess.Popen(
+        [sys.executable, "server.py", "--port", str(port), *args],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+def summarize(pids):
+    memory = [memory_mb(pid) for pid in pids]
+    return {
+        "processes": len(memory),
+        "rss_mb_per_process": round(sum(m["rss"] for m in memory) / len(memory), 1),
+        "uss_mb_per_process": round(sum(m["uss"] for m in memory) / len(memory), 1),
+        "pss_mb_total": round(sum(m["pss"] for m in memory), 1),
+    }
+def measure(name, processes, ports, workers, concurrency, duration):
+    try:
+        startup = wait_ready(ports, workers)
+        pids = [p.pid for p in processes] + [c for p in processes for c in children(p.pid)]
+        before = summarize(pids)
+        # Independent servers are driven one port after another with an equal share of the clients
+        load = [run_level("127.0.0.1", port, max(1, concurrency // len(ports)), duration / len(ports)) for port in ports]
+        after = summarize(pids)
+    finally:
+        for process in processes:
+            process.send_signal(signal.SIGTERM)
+        for process in processes:
+            process.wait(timeout=30)
+    requests = sum(level["requests"] for level in load)
+    print(f"{name}\n  ready after {startup:.2f}s")
+    print(f"  idle      {before}")
+    print(f"  loaded    {after}")
+    print(f"  load      {requests} requests, {sum(level['errors'] for level in load)} errors, "
+          f"{requests / duration:.0f} req/s")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--model", default=os.path.join("models", "svc.pkl"))
+    parser.add_argument("--artifact", default=os.path.join("models", "artifacts", "svc"))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds of load per layout")
+    args = parser.parse_args(argv)
+    n = args.workers
+    ports = list(range(args.port, args.port + n))
+    layouts = [
+        (f"{n} independent servers ({args.model})", [["--model", args.model]] * n, ports),
+        (f"prefork --workers {n} ({args.model})", [["--model", args.model, "--workers", str(n)]], [args.port]),
+        (f"prefork --workers {n} ({args.artifact})", [["--model", args.artifact, "--workers", str(n)]], [args.port]),
+    ]
+    for name, commands, layout_ports in layouts:
+        if args.artifact in name and not os.path.isdir(os.path.join(APP_DIR, args.artifact)):
+            print(f"{name}: skipped, run `python artifacts.py export` first")
+            continue
+        processes = [launch(command, port) for command, port in zip(commands, layout_ports)]
+        measure(name, processes, layout_ports, n, args.concurrency, args.duration)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Time-to-first-result of recommendation lookups: the sequential pandas path versus recommendations.py.
+
+Run from the SymptoCure directory:  python benchmarks/bench_recommendations.py --repeat 20
+
+"sequential" calls each section's source one after another and returns the payload when the
+last one is done, so its first result is the whole payload. The service submits every section
+at once and its first result is the first section to complete. Both are measured with
+frame_sources() (a pandas filter per section, the original path) and record_sources() (the
+precomputed per-disease records, on the pool and inline). The end-to-end rows add a one-row prediction in front: the
+old page showed nothing until diagnosis and recommendations were both ready, the streamed page
+shows the diagnosis as soon as the model has answered.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+from batch_predict import BatchPredictor
+from knowledge_base import clean_disease_name
+from loaders import MODEL_PATH, read_data
+from recommendations import RecommendationService, frame_sources, record_sources
+from symptom_index import parse_symptoms
+def sequential(sources, disease):
+    name = clean_disease_name(disease)
+    return {'disease': disease, **{section: source(name) for section, source in sources.items()}}
+def time_sequential(sources, disease):
+    start = time.perf_counter()
+    sequential(sources, disease)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, elapsed
+def time_stream(service, disease):
+    start = time.perf_counter()
+    first = None
+    for _ in service.stream(disease):
+        if first is None:
+            first = (time.perf_counter() - start) * 1000
+    return first, (time.perf_counter() - start) * 1000
+def report(name, samples):
+    first, full = zip(*samples)
+    print(f"  {name:38s} first {statistics.median(first):8.3f} ms   full {statistics.median(full):8.3f} ms")
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--symptoms", default="itching, skin rash, nodal skin eruptions, dischromic patches")
+    args = parser.parse_args(argv)
+    warnings.filterwarnings("ignore")
+    predictor = BatchPredictor.from_paths(args.model)
+    frames, records = frame_sources(read_data()), record_sources(predictor.records)
+    services = {
+        "frames": RecommendationService(frames),
+        "records": RecommendationService(records),
+        "inline": RecommendationService.from_records(predictor.records),
+    }
+    diseases = list(predictor.labels) * args.repeat
+    for service in services.values():
+        service.fetch_batch(predictor.labels)
+    print(f"per disease (median over {len(diseases)} lookups)")
+    report("sequential pandas (original)", [time_sequential(frames, d) for d in diseases])
+    report("service, pandas sources", [time_stream(services["frames"], d) for d in diseases])
+    report("sequential precomputed records", [time_sequential(records, d) for d in diseases])
+    report("service, records, thread pool", [time_stream(services["records"], d) for d in diseases])
+    report("service, records, inline (default)", [time_stream(services["inline"], d) for d in diseases])
+    print(f"batch of all {len(predictor.labels)} diseases (median of {args.repeat})")
+    for name, run in [
+        ("sequential pandas (original)", lambda: [sequential(frames, d) for d in predictor.labels]),
+        ("service.fetch_batch, pandas", lambda: services["frames"].fetch_batch(predictor.labels)),
+        ("service.fetch_batch, records, pool", lambda: services["records"].fetch_batch(predictor.labels)),
+        ("service.fetch_batch, records, inline", lambda: services["inline"].fetch_batch(predictor.labels)),
+    ]:
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            run()
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"  {name:38s} {statistics.median(times):8.3f} ms")
+    tokens = parse_symptoms(args.symptoms)
+    old, new = [], []
+    for _ in range(args.repeat * 5):
+        start = time.perf_counter()
+        prediction = next(predictor.predict_chunk([tokens]))['prediction']
+        sequential(frames, prediction)
+        elapsed = (time.perf_counter() - start) * 1000
+        old.append((elapsed, elapsed))
+        start = time.perf_counter()
+        prediction = next(predictor.predict_chunk([tokens]))['prediction']
+        sections = services["inline"].stream(prediction)
+        first = (time.perf_counter() - start) * 1000
+        for _ in sections:
+            pass
+        new.append((first, (time.perf_counter() - start) * 1000))
+    print(f"end to end from '{args.symptoms}' (first result = diagnosis on screen)")
+    report("predict, then sequential pandas", old)
+    report("predict, stream from records", new)
+if __name__ == "__main__":
+    main()
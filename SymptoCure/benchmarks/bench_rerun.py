@@ -0,0 +1,55 @@
+"""Rerun latency of the Predict and Disease Info pages, current app.py vs a git revision.
+
+Run from the SymptoCure directory:  python benchmarks/bench_rerun.py --baseline-rev HEAD~1
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+from streamlit.testing.v1 import AppTest
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["🔍 Predict Disease", "📋 Disease Info"]
+def time_reruns(app_path, page, reruns):
+    at = AppTest.from_file(app_path, default_timeout=120)
+    at.run()
+    at.sidebar.radio[0].set_value(page)
+    at.run()
+    timings = []
+    for i in range(reruns):
+        if page == "📋 Disease Info":
+            options = at.selectbox[0].options
+            at.selectbox[0].set_value(options[i % len(options)])
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+        if at.exception:
+            raise RuntimeError(f"{app_path} raised on {page}: {at.exception[0].value}")
+    return timings
+def export_revision(rev, target_dir):
+    source = subprocess.run(
+        ["git", "show", f"{rev}:./app.py"], cwd=APP_DIR, check=True, capture_output=True
+    ).stdout
+    path = os.path.join(target_dir, "app.py")
+    with open(path, "wb") as f:
+        f.write(source)
+    return path
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline-rev", default=None, help="git revision of app.py to compare against")
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+    os.chdir(APP_DIR)
+    apps = {"current": os.path.join(APP_DIR, "app.py")}
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.baseline_rev:
+            apps = {"baseline": export_revision(args.baseline_rev, tmp), **apps}
+        print(f"{'app':<10} {'page':<20} {'median ms':>10} {'p90 ms':>10}")
+        for label, path in apps.items():
+            for page in PAGES:
+                timings = sorted(time_reruns(path, page, args.reruns))
+                p90 = timings[int(0.9 * (len(timings) - 1))]
+                print(f"{label:<10} {page:<20} {statistics.median(timings):>10.1f} {p90:>10.1f}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Per-prediction overhead of severity risk scoring, next to the model prediction it accompanies.
+
+Run from the SymptoCure directory:  python benchmarks/bench_risk.py --repeat 2000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import warnings
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+from kb_bundle import load_bundle
+from knowledge_base import build_disease_records
+from loaders import MODEL_PATH, read_model
+from risk import RiskScorer
+from symptom_index import SymptomIndex
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+def time_us(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args(argv)
+    bundle = load_bundle()
+    data = bundle.frames()
+    X, _, _, feature_names = bundle.training()
+    X = X.astype(float)
+    model = read_model(args.model)
+    index = SymptomIndex(feature_names, data['symptom_severity']['Symptom'].tolist())
+    scorer = RiskScorer.from_severity(index, data['symptom_severity'])
+    records = build_disease_records(data)
+    vector, disease = X[0], "Fungal infection"
+    single_model = time_us(lambda: model.predict(X[:1]), args.repeat)
+    single_risk = time_us(lambda: scorer.assess(vector, disease, records), args.repeat)
+    print(f"single input: model.predict {single_model:8.1f} us  risk.assess {single_risk:6.1f} us"
+          f"  ({100 * single_risk / single_model:.1f}% of predict)")
+    batch_repeat = max(1, args.repeat // 100)
+    batch_model = time_us(lambda: model.predict(X), batch_repeat)
+    batch_score = time_us(lambda: scorer.score_many(X), batch_repeat)
+    batch_assess = time_us(lambda: list(scorer.assess_many(X, [disease] * len(X), records)), batch_repeat)
+    print(f"{len(X)} rows:   model.predict {batch_model / len(X):8.2f} us/row  score_many {batch_score / len(X):6.3f} us/row"
+          f"  assess_many {batch_assess / len(X):6.2f} us/row")
+if __name__ == "__main__":
+    main()
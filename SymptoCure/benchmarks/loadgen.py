@@ -0,0 +1,82 @@
+"""Closed-loop load generator for server.py: p50/p99 latency and requests/sec per concurrency level.
+
+    python server.py --port 8000 &
+    python benchmarks/loadgen.py --url http://127.0.0.1:8000 --concurrency 1 8 32 64
+"""
+import argparse
+import http.client
+import json
+import random
+import socket
+import statistics
+import threading
+import time
+from urllib.parse import urlparse
+SAMPLE_SYMPTOMS = [
+    "itching", "skin rash", "fatigue", "vomiting", "high fever", "headache", "nausea",
+    "joint pain", "cough", "chest pain", "abdominal pain", "yellowish skin", "chills",
+    "muscle pain", "loss of appetite", "breathlessness", "sweating", "dark urine",
+]
+def connect(host, port):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    conn.connect()
+    conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return conn
+def worker(host, port, duration, latencies, errors, seed):
+    rng = random.Random(seed)
+    conn = connect(host, port)
+    stop_at = time.perf_counter() + duration
+    while time.perf_counter() < stop_at:
+        body = json.dumps({"symptoms": rng.sample(SAMPLE_SYMPTOMS, rng.randint(2, 5))})
+        start = time.perf_counter()
+        try:
+            conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(repr(exc))
+            conn.close()
+            conn = connect(host, port)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    conn.close()
+def run_level(host, port, concurrency, duration):
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=worker, args=(host, port, duration, latencies, errors, i))
+        for i in range(concurrency)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 2) if latencies else None,
+        "p99_ms": round(latencies[int(0.99 * (len(latencies) - 1))], 2) if latencies else None,
+    }
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per concurrency level")
+    args = parser.parse_args()
+    url = urlparse(args.url)
+    print(f"{'conc':>5} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        r = run_level(url.hostname, url.port or 80, concurrency, args.duration)
+        print(f"{r['concurrency']:>5} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9} {r['p50_ms']:>8} {r['p99_ms']:>8}")
+        if r['errors']:
+            print(f"      first errors: {r['error_samples']}")
+if __name__ == "__main__":
+    main()
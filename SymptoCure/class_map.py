@@ -0,0 +1,91 @@
+"""Persisted class-index -> disease-name maps, stored next to each model.
+
+    python class_map.py            # write and validate models/<name>.labels.json for every model
+
+The notebook label-encodes Training.csv's raw prognosis strings, so class code i is the i-th
+sorted raw label. The map stores the whitespace-normalized names the app displays.
+"""
+import argparse
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from loaders import DATA_DIR, MODELS_DIR, read_model
+TRAINING_CSV = os.path.join(DATA_DIR, "Training.csv")
+class ClassMapError(ValueError):
+    pass
+def normalize_label(name):
+    return " ".join(str(name).split())
+def class_map_path(model_path):
+    if os.path.isdir(model_path):
+        return os.path.join(model_path, "labels.json")
+    return os.path.splitext(model_path)[0] + ".labels.json"
+def build_class_map(training_csv=TRAINING_CSV):
+    """Labels in LabelEncoder order (sorted raw prognosis), normalized for display"""
+    raw = pd.read_csv(training_csv, usecols=["prognosis"])["prognosis"].unique()
+    return [normalize_label(label) for label in sorted(raw)]
+def write_class_map(model_path, labels):
+    with open(class_map_path(model_path), "w") as f:
+        json.dump(list(labels), f, indent=1)
+def load_class_map(model_path):
+    path = class_map_path(model_path)
+    if not os.path.exists(path):
+        raise ClassMapError(f"No class map at {path}; run class_map.py")
+    with open(path) as f:
+        return np.array(json.load(f), dtype=object)
+def _training_sample(training_csv, bundle):
+    """(one feature row per disease, its normalized label, all normalized labels)"""
+    if bundle is not None:
+        X, y, raw_labels, _ = bundle.training()
+        names = np.array([normalize_label(label) for label in raw_labels], dtype=object)
+        _, first_rows = np.unique(y, return_index=True)
+        return X[first_rows].astype(np.float64), names[y[first_rows]], set(names)
+    training = pd.read_csv(training_csv)
+    training["prognosis"] = training["prognosis"].map(normalize_label)
+    sample = training.drop_duplicates("prognosis")
+    X = sample.drop(columns="prognosis").to_numpy(dtype=np.float64)
+    return X, sample["prognosis"].to_numpy(), set(training["prognosis"])
+def validate_class_map(model, labels, training_csv=TRAINING_CSV, bundle=None):
+    """Fail fast unless decoding the model's prediction on one Training.csv row per disease gives that disease"""
+    classes = np.asarray(model.classes_)
+    if not np.array_equal(classes, np.arange(len(labels))):
+        raise ClassMapError(f"model has {len(classes)} classes, class map has {len(labels)} labels")
+    X, expected, all_labels = _training_sample(training_csv, bundle)
+    if all_labels != set(labels):
+        raise ClassMapError("class map labels differ from Training.csv prognosis values")
+    decoded = labels[np.asarray(model.predict(X), dtype=np.intp)]
+    wrong = [(want, got) for want, got in zip(expected, decoded) if want != got]
+    if wrong:
+        raise ClassMapError(f"{len(wrong)} of {len(expected)} diseases decode wrongly, e.g. {wrong[0][0]!r} -> {wrong[0][1]!r}")
+def decode(labels, codes):
+    """Map predicted class codes to names; codes outside the map become 'Unknown Disease (Code: n)'"""
+    codes = np.asarray(codes, dtype=np.intp)
+    in_range = (codes >= 0) & (codes < len(labels))
+    names = labels[np.where(in_range, codes, 0)]
+    if not in_range.all():
+        names[~in_range] = [f"Unknown Disease (Code: {code})" for code in codes[~in_range]]
+    return names
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--training-csv", default=TRAINING_CSV)
+    args = parser.parse_args(argv)
+    labels = np.array(build_class_map(args.training_csv), dtype=object)
+    failed = False
+    for filename in sorted(os.listdir(args.models_dir)):
+        if not filename.endswith(".pkl"):
+            continue
+        path = os.path.join(args.models_dir, filename)
+        write_class_map(path, labels)
+        try:
+            validate_class_map(read_model(path), labels, args.training_csv)
+            print(f"{filename}: ok ({len(labels)} classes)")
+        except ClassMapError as exc:
+            failed = True
+            print(f"{filename}: {exc}", file=sys.stderr)
+        except Exception as exc:
+            print(f"{filename}: map written, model not validated ({exc!r})", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+if __name__ == "__main__":
+    main()
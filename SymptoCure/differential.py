@@ -0,0 +1,115 @@
+"""Top-k differential diagnosis: calibrated class probabilities plus symptom-overlap evidence.
+
+Entries are ranked by the model's own class scores, so the first one is model.predict; their
+probabilities come from temperature-scaled predict_proba, fitted by calibrate() and kept
+non-increasing down the list. benchmarks/bench_differential.py measures accuracy and calibration.
+"""
+import copy
+from typing import NamedTuple
+import numpy as np
+from artifacts import ovr_decision, softmax
+from class_map import decode
+from knowledge_base import clean_disease_name
+from perturbation import perturb
+# Scales tried by fit_temperature(), log-spaced
+TEMPERATURES = np.geomspace(0.01, 100, 161)
+# (dropout, noise) conditions of the calibration rows, taken from evaluate.CONDITIONS
+CALIBRATION_CONDITIONS = ((0.0, 0), (0.2, 0), (0.4, 0), (0.2, 1))
+class DifferentialEntry(NamedTuple):
+    disease: str
+    probability: float
+    matched: int
+    total: int
+def _log(probabilities):
+    return np.log(np.clip(np.asarray(probabilities, dtype=np.float64), 1e-12, None))
+def class_scores(model, X):
+    """(ranking scores whose row-wise argmax is the prediction, log-probabilities), in model.classes_ order"""
+    if hasattr(model, "predict_detailed"):
+        # Ensemble: mean member probability (or vote share) from one pass over the members
+        log_p = _log(model.predict_detailed(X).probabilities)
+        return log_p, log_p
+    if getattr(model, "decision_function_shape", None) == "ovr":
+        # SVC: one-vs-rest scores built from the pairwise ones here, vectorized (sklearn loops over the
+        # 820 pairs in Python, ~20 ms a row) and with votes counted as predict counts them
+        ovo = copy.copy(model)
+        ovo.decision_function_shape = "ovo"
+        dec = np.asarray(ovo.decision_function(X), dtype=np.float64)
+        ranking = ovr_decision(dec, len(model.classes_), as_predict=True)
+    elif hasattr(model, "decision_function"):
+        ranking = np.asarray(model.decision_function(X), dtype=np.float64)
+        if ranking.ndim == 1:
+            ranking = np.column_stack([-ranking, ranking])
+    else:
+        ranking = None
+    log_p = _log(model.predict_proba(X)) if hasattr(model, "predict_proba") else ranking
+    return (log_p if ranking is None else ranking), log_p
+def fit_temperature(scores, columns):
+    """Temperature T minimizing the mean negative log-likelihood of softmax(scores / T) at the true columns"""
+    rows = np.arange(len(columns))
+    losses = [-np.log(np.clip(softmax(scores / t)[rows, columns], 1e-12, None)).mean() for t in TEMPERATURES]
+    return float(TEMPERATURES[int(np.argmin(losses))])
+def top_k_indices(scores, k):
+    """Row-wise column indices of the k highest scores, best first, ties by lowest index"""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        # Sorted so that equal scores keep column order, as argmax does
+        candidates = np.sort(np.argpartition(-scores, k - 1, axis=1)[:, :k], axis=1)
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1)
+def non_increasing(values):
+    """Pool-adjacent-violators: the closest non-increasing sequence, rising runs replaced by their mean"""
+    blocks = []
+    for value in values:
+        blocks.append([value, 1])
+        while len(blocks) > 1 and blocks[-2][0] * blocks[-1][1] < blocks[-1][0] * blocks[-2][1]:
+            total, count = blocks.pop()
+            blocks[-1][0] += total
+            blocks[-1][1] += count
+    return [total / count for total, count in blocks for _ in range(count)]
+class DifferentialDiagnoser:
+    """Ranked (disease, probability, matched, total) lists for vectorized inputs"""
+    def __init__(self, model, labels, kb, matcher, temperature=1.0):
+        self.model = model
+        self.matcher = matcher
+        self.temperature = temperature
+        self.labels = [str(label) for label in decode(labels, model.classes_)]
+        # Knowledge-base row of each classifier column (-1 when the disease has no symptom list)
+        rows = {disease: i for i, disease in enumerate(matcher.diseases)}
+        self.rows = np.array([
+            rows.get(kb.diseases_by_clean_name.get(clean_disease_name(label)), -1) for label in self.labels
+        ])
+        self.totals = np.where(self.rows >= 0, matcher.totals[self.rows], 0)
+    def calibrate(self, X, y, rows=1500, seed=0):
+        """Fit the temperature on up to rows Training.csv rows per condition, y being their class codes"""
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(len(X), size=min(rows, len(X)), replace=False)
+        X_cal = np.vstack([perturb(X[sample], rng, dropout, noise) for dropout, noise in CALIBRATION_CONDITIONS])
+        columns = np.searchsorted(self.model.classes_, np.tile(np.asarray(y)[sample], len(CALIBRATION_CONDITIONS)))
+        _, log_p = class_scores(self.model, X_cal.astype(np.float64))
+        self.temperature = fit_temperature(log_p, columns)
+        return self
+    def scores(self, X):
+        """(ranking scores, calibrated probabilities), both (n, n_classes) in classifier column order"""
+        ranking, log_p = class_scores(self.model, X)
+        return ranking, softmax(log_p / self.temperature)
+    def overlap(self, symptom_sets):
+        """Matched-symptom counts per input, (n, n_classes) in classifier column order"""
+        counts = self.matcher.match_counts(symptom_sets)
+        return np.where(self.rows >= 0, counts[:, self.rows], 0)
+    def rank_batch(self, X, symptom_sets, k=5):
+        """Top-k DifferentialEntry lists for each row of X and its symptom keys, the prediction first"""
+        ranking, probabilities = self.scores(X)
+        counts = self.overlap(symptom_sets)
+        top = top_k_indices(ranking, k)
+        ranked = np.take_along_axis(probabilities, top, axis=1).tolist()
+        return [
+            [
+                DifferentialEntry(self.labels[j], float(p), int(counts[i, j]), int(self.totals[j]))
+                for j, p in zip(row, non_increasing(ranked[i]))
+            ]
+            for i, row in enumerate(top)
+        ]
+    def rank(self, vector, symptom_keys, k=5):
+        return self.rank_batch(np.asarray(vector, dtype=np.float64)[None, :], [symptom_keys], k)[0]
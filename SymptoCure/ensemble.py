@@ -0,0 +1,146 @@
+import glob
+import os
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
+import numpy as np
+from loaders import MODELS_DIR, read_model
+METHODS = ('vote', 'proba')
+def available_models(models_dir=MODELS_DIR):
+    """Model names (file stems) of every pickle in models/"""
+    return sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(models_dir, '*.pkl')))
+class EnsembleResult(NamedTuple):
+    predictions: np.ndarray
+    member_predictions: dict
+    timings: dict
+    dropped: tuple
+    probabilities: np.ndarray
+class Ensemble:
+    """Runs several classifiers concurrently and combines them by majority vote or mean probability"""
+    def __init__(self, models, method='vote', budget=None, max_workers=None, probe_every=50):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}")
+        if not models:
+            raise ValueError("an ensemble needs at least one model")
+        self.models = dict(models)
+        self.paths = {}
+        self.method = method
+        self.budget = budget
+        self.probe_every = probe_every
+        first = next(iter(self.models.values()))
+        self.feature_names_in_ = first.feature_names_in_
+        self.classes_ = np.unique(np.concatenate([m.classes_ for m in self.models.values()]))
+        self.stats = {name: {'calls': 0, 'seconds': 0.0, 'dropped': 0} for name in self.models}
+        self._slow = {}
+        # Member -> its call still running past an earlier deadline; a running call can't be cancelled
+        self._late = {}
+        self._calls = 0
+        self._max_workers = max_workers or len(self.models)
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='ensemble')
+    def after_fork(self):
+        """Start a fresh member pool in a forked worker, where the parent's pool threads don't exist"""
+        self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='ensemble')
+        self._late = {}
+    @classmethod
+    def load(cls, names=None, models_dir=MODELS_DIR, **kwargs):
+        """Load the named models once; with names=None every loadable pickle in models_dir is used"""
+        explicit = names is not None
+        if explicit:
+            unknown = [name for name in names if not os.path.exists(os.path.join(models_dir, f'{name}.pkl'))]
+            if unknown:
+                raise ValueError(f"unknown model {', '.join(unknown)}; available: {', '.join(available_models(models_dir))}")
+        models, paths = {}, {}
+        for name in (names if explicit else available_models(models_dir)):
+            path = os.path.join(models_dir, f'{name}.pkl')
+            try:
+                models[name] = read_model(path)
+            except Exception as exc:
+                if explicit:
+                    raise
+                warnings.warn(f"Skipping model {name}: {exc!r}")
+                continue
+            paths[name] = path
+        ensemble = cls(models, **kwargs)
+        ensemble.paths = paths
+        return ensemble
+    def _run_member(self, name, X):
+        start = time.perf_counter()
+        model = self.models[name]
+        if self.method == 'proba' and hasattr(model, 'predict_proba'):
+            output = model.predict_proba(X)
+        else:
+            output = model.predict(X)
+        return output, time.perf_counter() - start
+    def _members_for_call(self):
+        # Members that blew the budget last time sit out, except for a periodic probe call
+        self._calls += 1
+        if self.budget is None or self._calls % self.probe_every == 0:
+            return list(self.models)
+        active = [name for name in self.models if not self._slow.get(name)]
+        return active or list(self.models)
+    def _as_proba(self, name, output):
+        proba = np.zeros((len(output), len(self.classes_)))
+        columns = np.searchsorted(self.classes_, self.models[name].classes_)
+        if output.ndim == 1:
+            proba[np.arange(len(output)), np.searchsorted(self.classes_, output)] = 1.0
+        else:
+            proba[:, columns] = output
+        return proba
+    def predict_detailed(self, X):
+        names = self._members_for_call()
+        # A member still busy with a late call would only queue behind it, so it sits this one out
+        self._late = {name: future for name, future in self._late.items() if not future.done()}
+        names = [name for name in names if name not in self._late] or names
+        futures = {self._pool.submit(self._run_member, name, X): name for name in names}
+        done, not_done = wait(futures, timeout=self.budget)
+        if not done:
+            # Nothing met the deadline: wait for the first member rather than fail the request
+            done, not_done = wait(not_done, return_when=FIRST_COMPLETED)
+        for future in not_done:
+            if not future.cancel():
+                self._late[futures[future]] = future
+        outputs, timings = {}, {}
+        for future in done:
+            name = futures[future]
+            output, seconds = future.result()
+            outputs[name] = output
+            timings[name] = seconds
+            self._slow[name] = self.budget is not None and seconds > self.budget
+            self.stats[name]['calls'] += 1
+            self.stats[name]['seconds'] += seconds
+        dropped = tuple(sorted(futures[f] for f in not_done) + sorted(set(self.models) - set(names)))
+        for name in dropped:
+            self._slow[name] = self._slow.get(name) or name in names
+            self.stats[name]['dropped'] += 1
+        votes = np.zeros((len(X), len(self.classes_)))
+        member_predictions = {}
+        for name, output in outputs.items():
+            proba = self._as_proba(name, output)
+            member_predictions[name] = self.classes_[proba.argmax(axis=1)]
+            if self.method == 'vote':
+                votes[np.arange(len(X)), proba.argmax(axis=1)] += 1
+            else:
+                votes += proba
+        probabilities = votes / votes.sum(axis=1, keepdims=True)
+        return EnsembleResult(self.classes_[votes.argmax(axis=1)], member_predictions, timings, dropped, probabilities)
+    def predict(self, X):
+        return self.predict_detailed(X).predictions
+    def predict_proba(self, X):
+        """Mean member probability with method='proba', the share of member votes with method='vote'"""
+        return self.predict_detailed(X).probabilities
+def add_ensemble_arguments(parser):
+    parser.add_argument('--ensemble', default=None, metavar='NAMES',
+                        help="comma separated model names from models/ (or 'all') to combine instead of --model")
+    parser.add_argument('--ensemble-method', choices=METHODS, default='vote')
+    parser.add_argument('--budget-ms', type=float, default=None,
+                        help="per-request deadline; ensemble members slower than this are dropped")
+def ensemble_from_args(args, models_dir=MODELS_DIR):
+    if not args.ensemble:
+        return None
+    names = None if args.ensemble == 'all' else [n.strip() for n in args.ensemble.split(',') if n.strip()]
+    budget = args.budget_ms / 1000 if args.budget_ms is not None else None
+    try:
+        return Ensemble.load(names, models_dir, method=args.ensemble_method, budget=budget)
+    except ValueError as exc:
+        raise SystemExit(f"--ensemble: {exc}")
@@ -0,0 +1,234 @@
+"""Reproducible quality and inference benchmarks for every model, written to one JSON report.
+
+    python evaluate.py                                   # all models, 5-fold CV, report to evaluation_report.json (untracked)
+    python evaluate.py --models svc multinomial_nb --folds 3
+    python evaluate.py --baseline old_report.json        # exit 1 on accuracy or latency regressions
+
+Quality: Training.csv holds only ~300 distinct symptom patterns repeated ~16 times, so a random
+split puts copies of every test row in the training set (hence model_results.csv's 1.0s). Folds
+here are grouped by symptom pattern, and each held-out fold is also scored after randomly dropping
+symptoms (patients rarely report all of them) and after adding unrelated ones.
+
+Runtime: each model in models/ (and models/artifacts/, if exported) is loaded in a fresh process
+that reports load time, resident memory, single-row latency and throughput per batch size.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+import sklearn
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import StratifiedGroupKFold
+from threadpoolctl import threadpool_limits
+from artifacts import RSS_MB_SOURCE
+from ensemble import available_models
+from loaders import BASE_DIR, DATA_DIR, MODELS_DIR
+from perturbation import perturb
+from train import load_training, model_slug, model_zoo
+REPORT_PATH = os.path.join(BASE_DIR, "evaluation_report.json")
+CONDITIONS = {
+    "clean": {},
+    "dropout_20": {"dropout": 0.2},
+    "dropout_40": {"dropout": 0.4},
+    "noise_1": {"noise": 1},
+    "noise_2": {"noise": 2},
+    "dropout_20_noise_1": {"dropout": 0.2, "noise": 1},
+}
+BATCH_SIZES = (1, 32, 256, 4096)
+def pattern_groups(X):
+    """Id of each row's distinct symptom pattern, so identical rows never straddle folds"""
+    _, groups = np.unique(np.asarray(X), axis=0, return_inverse=True)
+    return groups.ravel()
+def cross_validate(estimators, X, y, folds=5, seed=42, conditions=CONDITIONS):
+    """Per model and condition: mean/std accuracy and macro F1 over pattern-grouped folds"""
+    splitter = StratifiedGroupKFold(n_splits=folds, shuffle=True, random_state=seed)
+    X_values = X.to_numpy()
+    scores = {name: {condition: {"accuracy": [], "macro_f1": []} for condition in conditions} for name in estimators}
+    fit_seconds = {name: [] for name in estimators}
+    for fold, (train_rows, test_rows) in enumerate(splitter.split(X_values, y, pattern_groups(X_values))):
+        # The same perturbed test sets for every model
+        test_sets = {
+            condition: perturb(X_values[test_rows], np.random.default_rng([seed, fold, i]), **kwargs)
+            for i, (condition, kwargs) in enumerate(conditions.items())
+        }
+        for name, estimator in estimators.items():
+            model = clone(estimator)
+            start = time.perf_counter()
+            model.fit(X.iloc[train_rows], y[train_rows])
+            fit_seconds[name].append(time.perf_counter() - start)
+            for condition, X_test in test_sets.items():
+                y_pred = model.predict(pd.DataFrame(X_test, columns=X.columns))
+                scores[name][condition]["accuracy"].append(accuracy_score(y[test_rows], y_pred))
+                scores[name][condition]["macro_f1"].append(f1_score(y[test_rows], y_pred, average="macro", zero_division=0))
+            print(f"fold {fold + 1}/{folds} {name}: clean accuracy {scores[name]['clean']['accuracy'][-1]:.3f}", file=sys.stderr)
+    return {
+        name: {
+            "fit_seconds": round(statistics.mean(fit_seconds[name]), 3),
+            **{
+                condition: {
+                    metric: {"mean": round(statistics.mean(values), 4), "std": round(statistics.pstdev(values), 4)}
+                    for metric, values in metrics.items()
+                }
+                for condition, metrics in by_condition.items()
+            },
+        }
+        for name, by_condition in scores.items()
+    }
+_RUNTIME_CHILD = r"""
+import json, statistics, sys, time, warnings
+warnings.filterwarnings("ignore")
+{rss_mb}
+sys.path.insert(0, {base!r})
+path, repeats, batch_sizes = sys.argv[1], int(sys.argv[2]), json.loads(sys.argv[3])
+before = rss_mb()
+start = time.perf_counter()
+if path.endswith('.pkl'):
+    from loaders import read_model as load
+else:
+    from artifacts import load_artifact as load
+model = load(path)
+load_seconds = time.perf_counter() - start
+import numpy as np
+model.predict(np.zeros((1, len(model.feature_names_in_))))
+rss = rss_mb() - before
+from kb_bundle import load_bundle
+X = load_bundle().training()[0].astype(np.float64)
+latencies = []
+for i in range(repeats):
+    row = X[i % len(X)][None, :]
+    t = time.perf_counter()
+    model.predict(row)
+    latencies.append((time.perf_counter() - t) * 1000)
+latencies.sort()
+throughput = {{}}
+for size in batch_sizes:
+    batch = X[np.arange(size) % len(X)]
+    best = float('inf')
+    for _ in range(max(1, min(20, 20000 // size))):
+        t = time.perf_counter()
+        model.predict(batch)
+        best = min(best, time.perf_counter() - t)
+    throughput[str(size)] = round(size / best, 1)
+print(json.dumps({{
+    'load_seconds': round(load_seconds, 4),
+    'rss_mb': round(rss, 1),
+    'latency_ms': {{
+        'p50': round(statistics.median(latencies), 4),
+        'p99': round(latencies[int(len(latencies) * 0.99) - 1], 4),
+    }},
+    'rows_per_sec': throughput,
+}}))
+"""
+def runtime_benchmark(path, repeats=500, batch_sizes=BATCH_SIZES):
+    """Load time, memory, latency and throughput of one model, measured in a fresh process"""
+    child = _RUNTIME_CHILD.format(base=BASE_DIR, rss_mb=RSS_MB_SOURCE)
+    env = {**os.environ, "OMP_NUM_THREADS": "1", "OPENBLAS_NUM_THREADS": "1", "MKL_NUM_THREADS": "1"}
+    proc = subprocess.run(
+        [sys.executable, "-c", child, path, str(repeats), json.dumps(list(batch_sizes))],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"}
+    return json.loads(proc.stdout)
+def rank(cv, runtime):
+    """Models ordered by robust accuracy (mean over all conditions) per millisecond of single-row latency"""
+    ranking = []
+    for name, result in runtime.items():
+        slug = name.split("/")[-1]
+        if slug not in cv or "error" in result:
+            continue
+        robust = statistics.mean(cv[slug][c]["accuracy"]["mean"] for c in CONDITIONS if c in cv[slug])
+        latency = result["latency_ms"]["p50"]
+        ranking.append({
+            "model": name,
+            "robust_accuracy": round(robust, 4),
+            "latency_ms_p50": latency,
+            "accuracy_per_ms": round(robust / latency, 2) if latency else None,
+        })
+    return sorted(ranking, key=lambda row: -(row["accuracy_per_ms"] or 0))
+def compare(report, baseline, accuracy_tolerance=0.02, latency_tolerance=0.25, latency_floor_ms=0.05):
+    """Human-readable regressions of report against a baseline report; latency changes under
+    latency_floor_ms are timer noise and never count"""
+    problems = []
+    for name, conditions in report["cross_validation"].items():
+        for condition, metrics in conditions.items():
+            old = baseline.get("cross_validation", {}).get(name, {}).get(condition)
+            if isinstance(metrics, dict) and old and metrics["accuracy"]["mean"] < old["accuracy"]["mean"] - accuracy_tolerance:
+                problems.append(f"{name} {condition} accuracy {old['accuracy']['mean']} -> {metrics['accuracy']['mean']}")
+    for name, result in report["runtime"].items():
+        old = baseline.get("runtime", {}).get(name)
+        if old and "error" not in old and "error" not in result:
+            new_p50, old_p50 = result["latency_ms"]["p50"], old["latency_ms"]["p50"]
+            if new_p50 > old_p50 * (1 + latency_tolerance) and new_p50 - old_p50 > latency_floor_ms:
+                problems.append(f"{name} p50 latency {old['latency_ms']['p50']} -> {result['latency_ms']['p50']} ms")
+    return problems
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", nargs="*", default=None, help="model file stems (default: all)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeats", type=int, default=500, help="single-row predictions timed per model")
+    parser.add_argument("--skip-cv", action="store_true")
+    parser.add_argument("--skip-runtime", action="store_true")
+    parser.add_argument("--output", default=REPORT_PATH)
+    parser.add_argument("--baseline", default=None, help="earlier report to check for regressions")
+    parser.add_argument("--accuracy-tolerance", type=float, default=0.02, help="allowed absolute accuracy drop")
+    parser.add_argument("--latency-tolerance", type=float, default=0.25, help="allowed relative p50 latency rise")
+    args = parser.parse_args(argv)
+    X, y, _, data_hash = load_training(args.data_dir)
+    zoo = {model_slug(name): est for name, est in model_zoo().items()}
+    names = args.models or sorted(set(zoo) | set(available_models(args.models_dir)))
+    report = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "sklearn": sklearn.__version__,
+            "numpy": np.__version__,
+            "cpus": os.cpu_count(),
+            "training_sha256": data_hash,
+            "folds": args.folds,
+            "seed": args.seed,
+            "conditions": CONDITIONS,
+        },
+        "cross_validation": {},
+        "runtime": {},
+    }
+    if not args.skip_cv:
+        with threadpool_limits(1):
+            report["cross_validation"] = cross_validate(
+                {name: zoo[name] for name in names if name in zoo}, X, y, args.folds, args.seed
+            )
+    if not args.skip_runtime:
+        artifacts_dir = os.path.join(args.models_dir, "artifacts")
+        for name in names:
+            paths = {name: os.path.join(args.models_dir, f"{name}.pkl"),
+                     f"artifacts/{name}": os.path.join(artifacts_dir, name)}
+            for label, path in paths.items():
+                if os.path.exists(path):
+                    report["runtime"][label] = runtime_benchmark(path, args.repeats)
+                    print(f"{label}: {report['runtime'][label]}", file=sys.stderr)
+    report["ranking"] = rank(report["cross_validation"], report["runtime"])
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1)
+    for row in report["ranking"]:
+        print(f"{row['model']:32s} robust accuracy {row['robust_accuracy']:.3f}  "
+              f"p50 {row['latency_ms_p50']:.3f} ms  accuracy/ms {row['accuracy_per_ms']}")
+    print(f"wrote {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(report, json.load(f), args.accuracy_tolerance, args.latency_tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        if problems:
+            sys.exit(1)
+if __name__ == "__main__":
+    main()
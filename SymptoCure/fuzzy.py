@@ -0,0 +1,115 @@
+"""Typo-tolerant symptom lookup: a word-prefix trie for autocomplete and a trigram index for corrections.
+
+Keys are canonical snake_case symptom keys (symptom_index.normalize_symptom). Corrections
+compare the alphanumeric-only form, so spacing and separator differences cost nothing and
+only real typos count against a candidate.
+"""
+import re
+from collections import defaultdict
+import numpy as np
+MIN_SIMILARITY = 0.75
+_COMPLETIONS_PER_NODE = 10
+_CANDIDATES = 8
+_NON_ALNUM = re.compile(r"[^a-z0-9]")
+def squash(text):
+    """Lowercase ASCII letters and digits only, the form names are compared in"""
+    return _NON_ALNUM.sub("", str(text).lower())
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+def edit_distance(a, b, max_distance=None):
+    """Optimal string alignment distance (insert, delete, substitute, adjacent swap); gives up past max_distance"""
+    n, m = len(a), len(b)
+    bound = max(n, m) if max_distance is None else max_distance
+    if abs(n - m) > bound:
+        return bound + 1
+    # Only cells within `bound` of the diagonal can stay under the bound (Ukkonen's band)
+    far = bound + 1
+    previous2, previous = None, [j if j <= bound else far for j in range(m + 1)]
+    for i in range(1, n + 1):
+        current = [far] * (m + 1)
+        if i <= bound:
+            current[0] = i
+        ai = a[i - 1]
+        for j in range(max(1, i - bound), min(m, i + bound) + 1):
+            best = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ai != b[j - 1]))
+            if i > 1 and j > 1 and ai == b[j - 2] and a[i - 2] == b[j - 1] and previous2[j - 2] + 1 < best:
+                best = previous2[j - 2] + 1
+            current[j] = best if best < far else far
+        if min(current) > bound:
+            return far
+        previous2, previous = previous, current
+    return previous[m]
+def similarity(a, b, min_similarity=0.0):
+    """1 - edit distance / longer length; 0.0 when below min_similarity"""
+    longest = max(len(a), len(b), 1)
+    max_distance = int((1.0 - min_similarity) * longest + 1e-9)
+    distance = edit_distance(a, b, max_distance)
+    return 1.0 - distance / longest if distance <= max_distance else 0.0
+class _TrieNode:
+    __slots__ = ("children", "completions")
+    def __init__(self):
+        self.children = {}
+        self.completions = []
+class FuzzyResolver:
+    """Ranked completions and corrections over a fixed set of symptom keys"""
+    def __init__(self, keys):
+        self.keys = tuple(sorted(set(keys)))
+        self.squashed = tuple(squash(key) for key in self.keys)
+        self._exact = {squashed: i for i, squashed in enumerate(self.squashed)}
+        self._root = _TrieNode()
+        # Shortest keys first, so 'fever' completes to high_fever before mild_fever_with_chills
+        for i in sorted(range(len(self.keys)), key=lambda i: (len(self.keys[i]), self.keys[i])):
+            words = self.keys[i].split("_")
+            for start in range(len(words)):
+                self._insert("_".join(words[start:]), i)
+        postings = defaultdict(list)
+        for i, squashed in enumerate(self.squashed):
+            for gram in _trigrams(squashed):
+                postings[gram].append(i)
+        self._postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self._gram_counts = np.array([len(_trigrams(s)) for s in self.squashed], dtype=np.float64)
+    def _insert(self, text, key_id):
+        node = self._root
+        for ch in text:
+            node = node.children.setdefault(ch, _TrieNode())
+            if len(node.completions) < _COMPLETIONS_PER_NODE and key_id not in node.completions:
+                node.completions.append(key_id)
+    def complete(self, prefix, k=5):
+        """Keys with a word starting with prefix ('rash' -> skin_rash), shortest first"""
+        node = self._root
+        for ch in "_".join(prefix.lower().replace("_", " ").split()):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [self.keys[i] for i in node.completions[:k]]
+    def candidates(self, text, k=5, min_similarity=MIN_SIMILARITY):
+        """Up to k (key, similarity) corrections for text, best first"""
+        query = squash(text)
+        if not query:
+            return []
+        exact = self._exact.get(query)
+        if exact is not None:
+            return [(self.keys[exact], 1.0)]
+        grams = _trigrams(query)
+        hits = [self._postings[g] for g in grams if g in self._postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.keys))
+        dice = 2 * shared / (self._gram_counts + len(grams))
+        shortlist = np.argpartition(-dice, _CANDIDATES)[:_CANDIDATES] if len(dice) > _CANDIDATES else np.arange(len(dice))
+        scored = []
+        for i in shortlist[np.argsort(-dice[shortlist], kind="stable")]:
+            if not shared[i]:
+                continue
+            # Once k candidates are in hand, anything worse than the k-th best can be cut off early
+            floor = sorted(score for score, _ in scored)[-k] if len(scored) >= k else min_similarity
+            score = similarity(query, self.squashed[i], floor)
+            if score >= floor and score > 0:
+                scored.append((score, self.keys[i]))
+        scored.sort(key=lambda pair: (-pair[0], pair[1]))
+        return [(key, score) for score, key in scored[:k] if score >= min_similarity]
+    def correct(self, text, min_similarity=MIN_SIMILARITY):
+        """Best correction for text, or None if nothing is close enough"""
+        best = self.candidates(text, k=1, min_similarity=min_similarity)
+        return best[0][0] if best else None
@@ -0,0 +1,173 @@
+"""Compiled knowledge-base bundle: every CSV in datasets/ in one versioned .npz, loaded without parsing.
+
+    python kb_bundle.py            # (re)build datasets/kb_bundle.npz
+    python kb_bundle.py --check    # report whether the bundle matches the CSVs
+
+The bundle stores string columns as fixed-width unicode arrays, Symptom_N columns as integer codes
+into a symptom vocabulary, the diet/medication list literals already parsed (flat values plus
+offsets), and Training.csv as a uint8 matrix with label codes. A manifest records the checksum of
+every source CSV; load_bundle() rebuilds automatically when any of them changes.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from knowledge_base import SYMPTOM_COLS, parse_list
+from loaders import DATA_DIR, read_data
+BUNDLE_VERSION = 1
+BUNDLE_NAME = "kb_bundle.npz"
+TRAINING_FILE = "Training.csv"
+LIST_COLUMNS = {'diets_df': 'Diet', 'meds_df': 'Medication'}
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+def _sources(data_dir):
+    return sorted(f for f in os.listdir(data_dir) if f.endswith(".csv"))
+def _fingerprint(data_dir):
+    sources = {}
+    for filename in _sources(data_dir):
+        st = os.stat(os.path.join(data_dir, filename))
+        sources[filename] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    return sources
+def _store_frame(arrays, key, df):
+    columns = []
+    for i, column in enumerate(df.columns):
+        name = f"{key}/{i}"
+        values = df[column]
+        if key in LIST_COLUMNS and column == LIST_COLUMNS[key]:
+            parsed = [parse_list(v) for v in values]
+            arrays[f"{name}/offsets"] = np.cumsum([0] + [len(p) for p in parsed])
+            arrays[f"{name}/values"] = np.array([item for p in parsed for item in p], dtype=str)
+            kind = "list"
+        elif key == 'symptoms_df' and column in SYMPTOM_COLS:
+            cleaned = values.astype("string").str.strip()
+            missing = cleaned.isna() | (cleaned == "")
+            vocab = arrays["symptom_vocab"]
+            codes = np.searchsorted(vocab, cleaned.fillna("").to_numpy(dtype=str))
+            arrays[name] = np.where(missing.to_numpy(), -1, codes).astype(np.int32)
+            kind = "symptom"
+        elif pd.api.types.is_numeric_dtype(values):
+            arrays[name] = values.to_numpy()
+            kind = "numeric"
+        else:
+            missing = values.isna().to_numpy()
+            arrays[name] = values.fillna("").astype(str).to_numpy(dtype=str)
+            arrays[f"{name}/na"] = missing
+            kind = "string"
+        columns.append({"name": str(column), "kind": kind})
+    return columns
+def build_bundle(data_dir=DATA_DIR, bundle_path=None):
+    """Parse the CSVs once and write the bundle atomically; returns the bundle path"""
+    bundle_path = bundle_path or os.path.join(data_dir, BUNDLE_NAME)
+    fingerprint = _fingerprint(data_dir)
+    data = read_data(data_dir)
+    arrays = {}
+    symptoms = data.get('symptoms_df')
+    if symptoms is not None:
+        stacked = pd.concat([symptoms[c] for c in SYMPTOM_COLS if c in symptoms]).astype("string").str.strip()
+        arrays["symptom_vocab"] = np.array(sorted(set(stacked.dropna()) - {""}), dtype=str)
+    frames = {key: _store_frame(arrays, key, df) for key, df in data.items()}
+    training_path = os.path.join(data_dir, TRAINING_FILE)
+    if os.path.exists(training_path):
+        training = pd.read_csv(training_path)
+        raw_labels, label_codes = np.unique(training.pop("prognosis").to_numpy(dtype=str), return_inverse=True)
+        arrays["training/X"] = training.to_numpy(dtype=np.uint8)
+        arrays["training/y"] = label_codes.astype(np.int16)
+        arrays["training/labels"] = raw_labels
+        arrays["training/features"] = np.array(training.columns, dtype=str)
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "frames": frames,
+        "sources": {
+            filename: {**stat, "sha256": _sha256(os.path.join(data_dir, filename))}
+            for filename, stat in fingerprint.items()
+        },
+    }
+    arrays["manifest"] = np.array(json.dumps(manifest))
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(bundle_path)), suffix=".npz.tmp")
+    with os.fdopen(fd, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, bundle_path)
+    return bundle_path
+def _is_current(manifest, data_dir):
+    if manifest.get("version") != BUNDLE_VERSION:
+        return False
+    recorded = manifest.get("sources", {})
+    if set(recorded) != set(_sources(data_dir)):
+        return False
+    for filename, stat in _fingerprint(data_dir).items():
+        saved = recorded[filename]
+        if (saved["size"], saved["mtime_ns"]) == (stat["size"], stat["mtime_ns"]):
+            continue
+        # Touched but maybe not changed (e.g. fresh checkout): fall back to the checksum
+        if saved["size"] != stat["size"] or saved["sha256"] != _sha256(os.path.join(data_dir, filename)):
+            return False
+    return True
+class KnowledgeBundle:
+    """Arrays from kb_bundle.npz plus DataFrames rebuilt from them without any CSV parsing"""
+    def __init__(self, arrays, manifest):
+        self.arrays = arrays
+        self.manifest = manifest
+        self.symptom_vocab = arrays.get("symptom_vocab", np.array([], dtype=str))
+    def frame(self, key):
+        columns = {}
+        for i, column in enumerate(self.manifest["frames"][key]):
+            name = f"{key}/{i}"
+            if column["kind"] == "list":
+                offsets, values = self.arrays[f"{name}/offsets"], self.arrays[f"{name}/values"].tolist()
+                columns[column["name"]] = [values[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+            elif column["kind"] == "symptom":
+                codes = self.arrays[name]
+                strings = self.symptom_vocab[np.clip(codes, 0, None)].astype(object)
+                strings[codes < 0] = None
+                columns[column["name"]] = strings
+            elif column["kind"] == "string":
+                strings = self.arrays[name].astype(object)
+                strings[self.arrays[f"{name}/na"]] = None
+                columns[column["name"]] = strings
+            else:
+                columns[column["name"]] = self.arrays[name]
+        return pd.DataFrame(columns)
+    def frames(self):
+        """Same keys and columns as loaders.read_data(), but Symptom_N values come back stripped and the
+        Diet/Medication cells as already parsed lists rather than list literals"""
+        return {key: self.frame(key) for key in self.manifest["frames"]}
+    def training(self):
+        """(X uint8, label codes, raw labels, feature names) for Training.csv"""
+        a = self.arrays
+        return a["training/X"], a["training/y"], a["training/labels"], a["training/features"]
+def load_bundle(data_dir=DATA_DIR, bundle_path=None, rebuild=True):
+    """Open the bundle, rebuilding it first if it is missing, from another version, or older than a CSV"""
+    bundle_path = bundle_path or os.path.join(data_dir, BUNDLE_NAME)
+    if os.path.exists(bundle_path):
+        with np.load(bundle_path, allow_pickle=False) as npz:
+            manifest = json.loads(str(npz["manifest"]))
+            if _is_current(manifest, data_dir):
+                return KnowledgeBundle({k: npz[k] for k in npz.files}, manifest)
+    if not rebuild:
+        raise FileNotFoundError(f"{bundle_path} is missing or stale; run kb_bundle.py")
+    build_bundle(data_dir, bundle_path)
+    return load_bundle(data_dir, bundle_path, rebuild=False)
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--check", action="store_true", help="only report whether the bundle is current")
+    args = parser.parse_args(argv)
+    bundle_path = os.path.join(args.data_dir, BUNDLE_NAME)
+    if args.check:
+        try:
+            load_bundle(args.data_dir, rebuild=False)
+            print(f"{bundle_path} is current")
+        except FileNotFoundError as exc:
+            print(exc)
+            raise SystemExit(1)
+        return
+    print(f"wrote {build_bundle(args.data_dir, bundle_path)}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import ast
+from types import MappingProxyType
+from typing import NamedTuple
+SYMPTOM_COLS = ['Symptom_1', 'Symptom_2', 'Symptom_3', 'Symptom_4']
+PRECAUTION_COLS = ['Precaution_1', 'Precaution_2', 'Precaution_3', 'Precaution_4']
+def clean_disease_name(name):
+    """Standardize disease names for comparison"""
+    name = str(name).lower().strip()
+    name = name.replace("(", "").replace(")", "")
+    name = name.replace("paroymsal", "paroxysmal")
+    name = name.replace("diseae", "disease")
+    name = name.replace("  ", " ")
+    return name
+class KnowledgeBase(NamedTuple):
+    """Read-only symptom/disease indexes, built once per process"""
+    disease_symptoms: MappingProxyType
+    symptom_diseases: MappingProxyType
+    diseases: tuple
+    clean_names: MappingProxyType
+    diseases_by_clean_name: MappingProxyType
+def build_knowledge_base(symptoms_df):
+    """Index symtoms_df.csv rows into disease->symptoms and symptom->diseases mappings"""
+    long_df = symptoms_df.melt(id_vars='Disease', value_vars=SYMPTOM_COLS, value_name='Symptom')
+    long_df = long_df.dropna(subset=['Symptom'])
+    long_df['Symptom'] = long_df['Symptom'].astype(str).str.strip()
+    long_df = long_df[long_df['Symptom'] != ''].drop_duplicates(['Disease', 'Symptom'])
+    # First-appearance order, as the CSV lists them: ranking ties between diseases go to the earlier one
+    disease_symptoms = {
+        disease: tuple(sorted(group)) for disease, group in long_df.groupby('Disease', sort=False)['Symptom']
+    }
+    symptom_diseases = {
+        symptom: tuple(sorted(group)) for symptom, group in long_df.groupby('Symptom', sort=True)['Disease']
+    }
+    diseases = tuple(disease_symptoms)
+    clean_names = {disease: clean_disease_name(disease) for disease in diseases}
+    return KnowledgeBase(
+        disease_symptoms=MappingProxyType(disease_symptoms),
+        symptom_diseases=MappingProxyType(symptom_diseases),
+        diseases=diseases,
+        clean_names=MappingProxyType(clean_names),
+        diseases_by_clean_name=MappingProxyType({v: k for k, v in clean_names.items()}),
+    )
+class DiseaseRecord(NamedTuple):
+    """Everything the Disease Info tabs render for one disease"""
+    description: str
+    diets: tuple
+    medications: tuple
+    precautions: tuple
+    workouts: tuple
+def parse_list(value):
+    """diets.csv/medications.csv store Python list literals as strings; already-parsed lists pass through"""
+    if isinstance(value, (list, tuple)):
+        return tuple(str(item).strip() for item in value)
+    if not isinstance(value, str):
+        return ()
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return (value.strip(),)
+    if isinstance(parsed, (list, tuple)):
+        return tuple(str(item).strip() for item in parsed)
+    return (str(parsed).strip(),)
+def _group(df, disease_col, values):
+    grouped = {}
+    if df is None or disease_col not in df.columns:
+        return grouped
+    for disease, value in zip(df[disease_col], values(df)):
+        grouped.setdefault(clean_disease_name(disease), []).extend(value)
+    return grouped
+def build_disease_records(data):
+    """Index description/diet/medication/precaution/workout CSVs by clean_disease_name"""
+    descriptions = _group(data.get('desc_df'), 'Disease', lambda df: ([str(d).strip()] for d in df['Description']))
+    diets = _group(data.get('diets_df'), 'Disease', lambda df: map(parse_list, df['Diet']))
+    medications = _group(data.get('meds_df'), 'Disease', lambda df: map(parse_list, df['Medication']))
+    precautions = _group(
+        data.get('precautions_df'), 'Disease',
+        lambda df: ([str(v).strip() for v in row if isinstance(v, str) and v.strip()]
+                    for row in df.reindex(columns=PRECAUTION_COLS).itertuples(index=False)),
+    )
+    workouts = _group(data.get('workout_df'), 'disease', lambda df: ([str(w).strip()] for w in df['workout']))
+    names = set(descriptions) | set(diets) | set(medications) | set(precautions) | set(workouts)
+    return MappingProxyType({
+        name: DiseaseRecord(
+            description=' '.join(descriptions.get(name, [])),
+            diets=tuple(diets.get(name, ())),
+            medications=tuple(medications.get(name, ())),
+            precautions=tuple(precautions.get(name, ())),
+            workouts=tuple(workouts.get(name, ())),
+        )
+        for name in names
+    })
@@ -0,0 +1,43 @@
+import os
+import pickle
+import warnings
+import pandas as pd
+from sklearn.exceptions import InconsistentVersionWarning
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "datasets")
+MODELS_DIR = os.path.join(BASE_DIR, "models")
+MODEL_PATH = os.path.join(MODELS_DIR, "svc.pkl")
+DATA_FILES = {
+    'symptom_severity': 'Symptom-severity.csv',
+    'symptoms_df': 'symtoms_df.csv',
+    'diets_df': 'diets.csv',
+    'meds_df': 'medications.csv',
+    'workout_df': 'workout_df.csv',
+    'precautions_df': 'precautions_df.csv',
+    'desc_df': 'description.csv'
+}
+def read_data(data_dir=DATA_DIR, on_missing=None):
+    """Read the knowledge-base CSVs, normalizing whitespace in Disease names"""
+    data = {}
+    for key, filename in DATA_FILES.items():
+        filepath = os.path.join(data_dir, filename)
+        if not os.path.exists(filepath):
+            if on_missing is None:
+                raise FileNotFoundError(f"Data file not found: {filepath}")
+            on_missing(filepath)
+            continue
+        df = pd.read_csv(filepath)
+        if 'Disease' in df.columns:
+            df['Disease'] = df['Disease'].str.strip()
+            df['Disease'] = df['Disease'].str.replace(r'\s+', ' ', regex=True)
+        data[key] = df
+    return data
+def read_model(path=MODEL_PATH):
+    """Unpickle a model, or open an exported artifact directory (see artifacts.py)"""
+    if os.path.isdir(path):
+        from artifacts import load_artifact
+        return load_artifact(path)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", category=InconsistentVersionWarning)
+        with open(path, 'rb') as f:
+            return pickle.load(f)
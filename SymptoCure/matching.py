@@ -0,0 +1,77 @@
+from fractions import Fraction
+import numpy as np
+from scipy import sparse
+from symptom_index import normalize_symptom
+class SymptomMatcher:
+    """Disease x symptom incidence matrix for overlap-based ranking"""
+    def __init__(self, diseases, symptoms, matrix):
+        self.diseases = tuple(diseases)
+        self.symptoms = tuple(symptoms)
+        self.columns = {normalize_symptom(s): i for i, s in enumerate(self.symptoms)}
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.int32)
+        self.matrix.setflags(write=False)
+        self.totals = self.matrix.sum(axis=1)
+        self._rank_table = self._build_rank_table(int(self.totals.max(initial=0)))
+    @classmethod
+    def from_knowledge_base(cls, kb):
+        symptoms = sorted(kb.symptom_diseases)
+        columns = {s: i for i, s in enumerate(symptoms)}
+        matrix = np.zeros((len(kb.diseases), len(symptoms)), dtype=np.int32)
+        for row, disease in enumerate(kb.diseases):
+            matrix[row, [columns[s] for s in kb.disease_symptoms[disease]]] = 1
+        return cls(kb.diseases, symptoms, matrix)
+    @staticmethod
+    def _build_rank_table(max_total):
+        # Integer rank of every (count, total) pair under the (count/total, count) ordering,
+        # so ranking can run on exact integer keys instead of floats.
+        pairs = [(c, t) for t in range(1, max_total + 1) for c in range(t + 1)]
+        order = sorted(set((Fraction(c, t), c) for c, t in pairs))
+        position = {key: i for i, key in enumerate(order)}
+        table = np.zeros((max_total + 1, max_total + 1), dtype=np.int64)
+        for c, t in pairs:
+            table[c, t] = position[(Fraction(c, t), c)]
+        return table
+    def column(self, symptom):
+        """Matrix column for a symptom name or key, or None"""
+        col = self.columns.get(symptom)
+        return col if col is not None else self.columns.get(normalize_symptom(symptom))
+    def encode(self, symptom_sets):
+        """Binary CSR matrix (n_sets x n_symptoms); unknown symptoms are ignored"""
+        indptr, indices = [0], []
+        for symptoms in symptom_sets:
+            cols = {self.column(s) for s in symptoms}
+            cols.discard(None)
+            indices.extend(sorted(cols))
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=np.int32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.symptoms)))
+    def match_counts(self, symptom_sets):
+        """Matched-symptom counts, shape (n_sets, n_diseases)"""
+        return np.asarray(self.encode(symptom_sets) @ self.matrix.T)
+    def top_k(self, counts, k=5):
+        """Row-wise indices of the k best diseases by (count/total, count), best first, -1 padded"""
+        counts = np.atleast_2d(counts)
+        n_diseases = len(self.diseases)
+        k = min(k, n_diseases)
+        keys = self._rank_table[counts, self.totals] * n_diseases + (n_diseases - 1 - np.arange(n_diseases))
+        keys = np.where(counts > 0, keys, -1)
+        if k < n_diseases:
+            candidates = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(n_diseases), keys.shape)
+        candidate_keys = np.take_along_axis(keys, candidates, axis=1)
+        order = np.argsort(-candidate_keys, axis=1)
+        top = np.take_along_axis(candidates, order, axis=1)
+        return np.where(np.take_along_axis(candidate_keys, order, axis=1) >= 0, top, -1)
+    def rank_batch(self, symptom_sets, k=5):
+        """Top-k (disease, count, total) matches for each symptom set"""
+        counts = self.match_counts(symptom_sets)
+        top = self.top_k(counts, k)
+        results = []
+        for row, indices in enumerate(top):
+            results.append([
+                (self.diseases[i], int(counts[row, i]), int(self.totals[i])) for i in indices if i >= 0
+            ])
+        return results
+    def rank(self, input_symptoms, k=5):
+        return self.rank_batch([input_symptoms], k)[0]
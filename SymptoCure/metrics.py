@@ -0,0 +1,264 @@
+"""Low-overhead stage timing: per-stage latency histograms and counters, exported as JSON or Prometheus text.
+
+    from metrics import METRICS
+    with METRICS.timer("predict.model"):
+        codes = model.predict(X)
+    @METRICS.timed("load.model")
+    def load_model(): ...
+
+A timed stage costs a couple of microseconds (two perf_counter calls, a bisect and a lock). Set
+SYMPTOCURE_PROFILE=1 (or pass --profile to server.py) to also run the sampling profiler, which
+records collapsed stacks of every thread for flamegraph.pl or speedscope.
+"""
+import bisect
+import collections
+import functools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+# Upper bounds in milliseconds; the last bucket is everything slower
+BUCKETS_MS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+PROFILE_ENV = "SYMPTOCURE_PROFILE"
+class Histogram:
+    """Fixed-bucket latency histogram in milliseconds; not locked, Metrics serializes updates"""
+    __slots__ = ("counts", "count", "total", "max")
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    def observe(self, ms):
+        self.counts[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+    def quantile(self, q):
+        """Estimate by linear interpolation inside the bucket holding the q-th observation"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                low = BUCKETS_MS[i - 1] if i else 0.0
+                high = BUCKETS_MS[i] if i < len(BUCKETS_MS) else self.max
+                return min(low + (high - low) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count, 4) if self.count else None,
+            "p50_ms": _round(self.quantile(0.5)),
+            "p90_ms": _round(self.quantile(0.9)),
+            "p99_ms": _round(self.quantile(0.99)),
+            "max_ms": round(self.max, 4),
+            "buckets": dict(zip([str(b) for b in BUCKETS_MS] + ["+Inf"], self.counts)),
+        }
+def _round(value):
+    return None if value is None else round(value, 4)
+class _Timer:
+    __slots__ = ("metrics", "stage", "start")
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.observe(self.stage, (time.perf_counter() - self.start) * 1000)
+        if exc_type is not None:
+            self.metrics.count(f"{self.stage}.errors")
+        return False
+class Metrics:
+    """Thread-safe registry of stage histograms, counters and gauge collectors"""
+    def __init__(self):
+        self.histograms = collections.defaultdict(Histogram)
+        self.counters = collections.Counter()
+        self.collectors = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+    def observe(self, stage, ms):
+        with self._lock:
+            self.histograms[stage].observe(ms)
+    def timer(self, stage):
+        """Context manager recording the block's wall time under stage (and stage.errors on exceptions)"""
+        return _Timer(self, stage)
+    def timed(self, stage):
+        """Decorator form of timer()"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with _Timer(self, stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+    def register(self, name, collector):
+        """Add a callable returning {gauge: number}, read at export time (e.g. cache stats)"""
+        self.collectors[name] = collector
+    def _gauges(self):
+        gauges = {}
+        for name, collector in list(self.collectors.items()):
+            try:
+                values = collector()
+            except Exception:
+                continue
+            gauges.update({f"{name}.{key}": value for key, value in values.items() if isinstance(value, (int, float))})
+        return gauges
+    def snapshot(self):
+        with self._lock:
+            stages = {stage: histogram.summary() for stage, histogram in sorted(self.histograms.items())}
+            counters = dict(sorted(self.counters.items()))
+        return {
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "pid": os.getpid(),
+            "stages": stages,
+            "counters": counters,
+            "gauges": self._gauges(),
+        }
+    def prometheus(self, prefix="symptocure"):
+        """Snapshot in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+        for stage, summary in snapshot["stages"].items():
+            cumulative = 0
+            for bound, n in summary["buckets"].items():
+                cumulative += n
+                le = bound if bound == "+Inf" else repr(float(bound) / 1000)
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+            total = (summary["mean_ms"] or 0) * summary["count"] / 1000
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {summary["count"]}')
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        lines += [f'{prefix}_events_total{{name="{name}"}} {value}' for name, value in snapshot["counters"].items()]
+        lines.append(f"# TYPE {prefix}_gauge gauge")
+        lines += [f'{prefix}_gauge{{name="{name}"}} {value}' for name, value in snapshot["gauges"].items()]
+        return "\n".join(lines) + "\n"
+    def write(self, path):
+        """Atomically replace path with the JSON snapshot"""
+        _write_atomic(path, json.dumps(self.snapshot(), indent=1))
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+def _write_atomic(path, text):
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+class SamplingProfiler:
+    """Samples every thread's stack every interval seconds and counts collapsed stacks"""
+    def __init__(self, interval=0.005, max_depth=64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self.stacks = collections.Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+    def start(self):
+        if not self.running:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+        return self
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            stacks = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                names = []
+                while frame is not None and len(names) < self.max_depth:
+                    code = frame.f_code
+                    names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stacks.append(";".join(reversed(names)))
+            with self._lock:
+                self.stacks.update(stacks)
+                self.samples += 1
+    def collapsed(self, limit=None):
+        """'frame;frame;frame count' lines, most sampled first"""
+        with self._lock:
+            top = self.stacks.most_common(limit)
+        return "\n".join(f"{stack} {n}" for stack, n in top) + "\n"
+    def write(self, path):
+        _write_atomic(path, self.collapsed())
+def profiling_requested():
+    return os.environ.get(PROFILE_ENV, "").lower() in ("1", "true", "yes", "on")
+class MetricsExporter:
+    """Background thread writing the metrics snapshot (and profile, if running) every interval seconds"""
+    def __init__(self, metrics, path, interval=10.0, profiler=None, profile_path=None):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.profiler = profiler
+        self.profile_path = profile_path
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+    def start(self):
+        self._thread.start()
+        return self
+    def flush(self):
+        try:
+            self.metrics.write(self.path)
+            if self.profiler is not None and self.profile_path:
+                self.profiler.write(self.profile_path)
+        except OSError:
+            pass
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+class _MetricsHandler(BaseHTTPRequestHandler):
+    metrics = None
+    profiler = None
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = self.metrics.prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(self.metrics.snapshot()), "application/json"
+        elif self.path == "/profile" and self.profiler is not None:
+            body, content_type = self.profiler.collapsed(), "text/plain"
+        else:
+            self.send_error(404)
+            return
+        body = body.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    def log_message(self, format, *args):
+        pass
+def serve_metrics(metrics, host="127.0.0.1", port=9100, profiler=None):
+    """Serve /metrics (Prometheus), /metrics.json and /profile from a daemon thread; returns the server"""
+    handler = type("BoundMetricsHandler", (_MetricsHandler,), {"metrics": metrics, "profiler": profiler})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+# Process-wide registry shared by the app, batch CLI and server
+METRICS = Metrics()
@@ -0,0 +1,117 @@
+"""Step-by-step symptom entry: narrow the candidate diseases per added symptom and suggest what to ask next.
+
+Candidates are the diseases listing every confirmed symptom in symtoms_df.csv, kept as an int
+bitset over kb.diseases and intersected with one posting bitset per added symptom. Suggestions
+pick the unasked symptom with the highest information gain about the prognosis over the
+Training.csv rows still consistent with the answers so far.
+"""
+from typing import NamedTuple
+import numpy as np
+from symptom_index import normalize_symptom
+class NarrowingState(NamedTuple):
+    """Answers so far plus the running results they produced; replace, never mutate"""
+    present: tuple
+    absent: tuple
+    candidates: int
+    counts: np.ndarray
+    rows: np.ndarray
+def _entropy(counts, axis=0):
+    totals = counts.sum(axis=axis, keepdims=True)
+    p = np.divide(counts, totals, out=np.zeros_like(counts, dtype=np.float64), where=totals > 0)
+    return -(p * np.log2(p, out=np.zeros_like(p), where=p > 0)).sum(axis=axis)
+class CandidateNarrower:
+    """Posting bitsets over the knowledge base and a de-duplicated Training.csv for information gain"""
+    def __init__(self, kb, matcher, X, y, symptom_index):
+        self.kb = kb
+        self.matcher = matcher
+        self.diseases = kb.diseases
+        self.postings = {}
+        for symptom, diseases in kb.symptom_diseases.items():
+            bits = 0
+            for disease in diseases:
+                bits |= 1 << kb.diseases.index(disease)
+            key = symptom_index.key_for(symptom) or normalize_symptom(symptom)
+            self.postings[key] = self.postings.get(key, 0) | bits
+        self.all_diseases = (1 << len(kb.diseases)) - 1
+        # Training.csv holds 4920 rows but only a few hundred distinct (symptoms, prognosis) pairs
+        rows = np.column_stack([np.asarray(X, dtype=np.uint8), np.asarray(y, dtype=np.int64)])
+        unique, weights = np.unique(rows, axis=0, return_counts=True)
+        self.X = unique[:, :-1].astype(np.float64)
+        self.y = unique[:, -1]
+        self.weights = weights.astype(np.float64)
+        self.n_classes = int(self.y.max()) + 1 if len(self.y) else 0
+        self.onehot = np.eye(self.n_classes)[self.y] * self.weights[:, None]
+        # One question per symptom: duplicate feature columns (fluid_overload) share a key
+        self.symptoms, self.feature_columns = [], []
+        for col, feature in enumerate(symptom_index.feature_names):
+            key = symptom_index.key_for(feature)
+            if key is not None and key not in self.symptoms:
+                self.symptoms.append(key)
+                self.feature_columns.append(col)
+        self.feature_columns = np.asarray(self.feature_columns)
+        self.symptom_position = {key: i for i, key in enumerate(self.symptoms)}
+        self.index = symptom_index
+    @classmethod
+    def from_bundle(cls, kb, matcher, bundle, symptom_index):
+        X, y, _, _ = bundle.training()
+        return cls(kb, matcher, X, y, symptom_index)
+    def start(self):
+        return NarrowingState((), (), self.all_diseases, np.zeros(len(self.diseases), dtype=np.int32),
+                              np.ones(len(self.X), dtype=bool))
+    def _feature_column(self, key):
+        position = self.symptom_position.get(key)
+        return self.feature_columns[position] if position is not None else None
+    def add(self, state, symptom, present=True):
+        """State after one more answer; only the delta for that symptom is applied"""
+        key = self.index.key_for(symptom) or normalize_symptom(symptom)
+        if key in state.present or (key in state.absent and not present):
+            return state
+        if key in state.absent:
+            # A "No" changed to present: rebuild, as the rows it filtered out no longer apply
+            return self.replay(state.present + (key,), tuple(k for k in state.absent if k != key))
+        col = self._feature_column(key)
+        if not present:
+            rows = state.rows & (self.X[:, col] == 0) if col is not None else state.rows
+            return state._replace(absent=state.absent + (key,), rows=rows)
+        matcher_col = self.matcher.column(key)
+        counts = state.counts + self.matcher.matrix[:, matcher_col] if matcher_col is not None else state.counts
+        rows = state.rows & (self.X[:, col] == 1) if col is not None else state.rows
+        return state._replace(
+            present=state.present + (key,),
+            candidates=state.candidates & self.postings.get(key, 0),
+            counts=counts,
+            rows=rows,
+        )
+    def replay(self, present=(), absent=()):
+        """State for a full set of answers, e.g. after one was removed or changed"""
+        state = self.start()
+        for symptom in present:
+            state = self.add(state, symptom)
+        for symptom in absent:
+            state = self.add(state, symptom, present=False)
+        return state
+    def candidates(self, state):
+        """Diseases whose symtoms_df.csv rows list every confirmed symptom, alphabetically"""
+        bits = state.candidates
+        return tuple(sorted(disease for i, disease in enumerate(self.diseases) if bits >> i & 1))
+    def top_matches(self, state, k=5):
+        """Best (disease, count, total) overlap matches from the running counts"""
+        top = self.matcher.top_k(state.counts, k)[0]
+        return [(self.diseases[i], int(state.counts[i]), int(self.matcher.totals[i])) for i in top if i >= 0]
+    def suggest(self, state, k=3):
+        """Up to k (symptom, information gain in bits) pairs, most discriminating first"""
+        rows = state.rows if state.rows.any() else np.ones(len(self.X), dtype=bool)
+        X = self.X[rows][:, self.feature_columns]
+        onehot = self.onehot[rows]
+        with_symptom = onehot.T @ X
+        class_counts = onehot.sum(axis=0)
+        without_symptom = class_counts[:, None] - with_symptom
+        n_with = with_symptom.sum(axis=0)
+        total = class_counts.sum()
+        gain = _entropy(class_counts) - (n_with * _entropy(with_symptom) + (total - n_with) * _entropy(without_symptom)) / total
+        for key in state.present + state.absent:
+            position = self.symptom_position.get(key)
+            if position is not None:
+                gain[position] = -np.inf
+        order = np.argsort(-gain, kind='stable')[:k]
+        return [(self.symptoms[i], float(gain[i])) for i in order if gain[i] > 1e-12]
@@ -0,0 +1,23 @@
+"""Simulated under- and over-reporting of symptoms, for evaluation, calibration, benchmarks and tests.
+
+Training.csv rows list every symptom of their disease; patients usually report only some of them,
+plus a few unrelated ones. perturb() turns clean rows into such inputs.
+"""
+import numpy as np
+def perturb(X, rng, dropout=0.0, noise=0):
+    """Copy of binary X with each present symptom dropped with probability dropout (at least one kept)
+    and noise absent symptoms switched on per row"""
+    X = np.array(X, dtype=np.uint8)
+    present = X == 1
+    if dropout:
+        dropped = present & (rng.random(X.shape) < dropout)
+        emptied = ~(present & ~dropped).any(axis=1) & present.any(axis=1)
+        # Rows that would lose everything keep one randomly chosen symptom
+        keep = np.where(present[emptied], rng.random(present[emptied].shape), -1).argmax(axis=1)
+        dropped[np.flatnonzero(emptied), keep] = False
+        X[dropped] = 0
+    if noise:
+        scores = np.where(X == 0, rng.random(X.shape), -1.0)
+        added = np.argpartition(-scores, noise - 1, axis=1)[:, :noise]
+        X[np.arange(len(X))[:, None], added] = 1
+    return X
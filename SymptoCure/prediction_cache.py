@@ -0,0 +1,115 @@
+"""Bounded LRU + TTL cache of complete prediction results, keyed on the canonical symptom set.
+
+Results must be JSON-serializable so they can optionally be written through to a sqlite file
+and survive restarts. Entries are namespaced by a fingerprint of the model and data files, so a
+retrained model or edited CSV never serves stale results from disk.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+def cache_key(symptom_keys):
+    """Order- and duplicate-insensitive key for a list of canonical symptom keys"""
+    return "|".join(sorted(set(symptom_keys)))
+def namespace_for(paths):
+    """Fingerprint (path, size, mtime) of the files a cached result depends on"""
+    digest = hashlib.sha256()
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+            digest.update(f"{os.path.abspath(path)}:{st.st_size}:{st.st_mtime_ns};".encode())
+        except OSError:
+            digest.update(f"{os.path.abspath(path)}:missing;".encode())
+    return digest.hexdigest()[:16]
+class PredictionCache:
+    """Thread-safe LRU with per-entry expiry and hit/miss/eviction counters"""
+    def __init__(self, maxsize=1024, ttl=3600.0, store_path=None, namespace=""):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.namespace = namespace
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "disk_hits": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if store_path:
+            os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+            self._db = sqlite3.connect(store_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions "
+                "(namespace TEXT, key TEXT, value TEXT, created REAL, PRIMARY KEY (namespace, key))"
+            )
+            # Other namespaces may belong to another model sharing the file, so they only age out by TTL;
+            # this one is also cut back to its maxsize newest entries
+            if ttl is not None:
+                self._db.execute("DELETE FROM predictions WHERE created < ?", (time.time() - ttl,))
+            self._db.execute(
+                "DELETE FROM predictions WHERE namespace = ? AND key NOT IN "
+                "(SELECT key FROM predictions WHERE namespace = ? ORDER BY created DESC LIMIT ?)",
+                (namespace, namespace, maxsize),
+            )
+    def _load(self, key, now):
+        row = self._db.execute(
+            "SELECT value, created FROM predictions WHERE namespace = ? AND key = ?", (self.namespace, key)
+        ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        if self.ttl is not None and now - created > self.ttl:
+            self._db.execute("DELETE FROM predictions WHERE namespace = ? AND key = ?", (self.namespace, key))
+            self.counters["expirations"] += 1
+            return None
+        return json.loads(value), created
+    def _insert(self, key, value, created):
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.counters["evictions"] += 1
+    def get(self, key):
+        """Cached result for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and now - entry[1] > self.ttl:
+                del self._entries[key]
+                self.counters["expirations"] += 1
+                entry = None
+            if entry is None and self._db is not None:
+                entry = self._load(key, now)
+                if entry is not None:
+                    self.counters["disk_hits"] += 1
+                    self._insert(key, *entry)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.counters["hits"] += 1
+            return entry[0]
+    def put(self, key, value):
+        now = time.time()
+        with self._lock:
+            self._insert(key, value, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), now),
+                )
+    def get_or_compute(self, key, compute):
+        """Cached result for key, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM predictions WHERE namespace = ?", (self.namespace,))
+    def stats(self):
+        with self._lock:
+            return {**self.counters, "size": len(self._entries), "maxsize": self.maxsize}
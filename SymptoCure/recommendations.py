@@ -0,0 +1,118 @@
+"""Recommendation payloads for predicted diseases: description, diets, medications, precautions and workouts.
+
+    service = RecommendationService.from_records(build_disease_records(data))
+    service.fetch("Fungal infection")               # one payload dict
+    service.fetch_batch(["Malaria", "Dengue"])      # {disease: payload}
+    for disease, section, value in service.stream("Malaria"):
+        ...                                         # sections in completion order
+
+Each section has its own source, a callable from clean_disease_name to the section's value.
+record_sources() answers from the precomputed DiseaseRecord of every disease; frame_sources()
+filters the CSV DataFrames with pandas on every call, as the app used to, and is kept as the
+reference path for benchmarks/bench_recommendations.py. All section lookups of a request (or of
+every disease in a batch) are submitted to one thread pool at once, so a slow source only delays
+its own section, and stream() hands each section over as soon as it is ready. With
+max_workers=0 lookups run inline instead; from_records() defaults to that, since a dict lookup
+(~3 us) is far cheaper than handing it to a pool thread (~100 us).
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+from knowledge_base import PRECAUTION_COLS, clean_disease_name, parse_list
+from metrics import METRICS
+SECTIONS = ('description', 'diets', 'medications', 'precautions', 'workouts')
+class Section(NamedTuple):
+    disease: str
+    name: str
+    value: object
+def _default(section):
+    return '' if section == 'description' else ()
+def record_sources(records):
+    """Section sources answering from build_disease_records() output"""
+    def source(section):
+        values = {name: getattr(record, section) for name, record in records.items()}
+        default = _default(section)
+        return lambda name: values.get(name, default)
+    return {section: source(section) for section in SECTIONS}
+def frame_sources(data):
+    """Section sources filtering read_data() DataFrames per lookup (the original per-request path)"""
+    def rows(key, disease_col, name):
+        df = data.get(key)
+        if df is None or disease_col not in df.columns:
+            return None
+        return df[df[disease_col].apply(clean_disease_name) == name]
+    def description(name):
+        match = rows('desc_df', 'Disease', name)
+        return ' '.join(str(d).strip() for d in match['Description']) if match is not None else ''
+    def listed(key, column):
+        def lookup(name):
+            match = rows(key, 'Disease', name)
+            return tuple(item for value in match[column] for item in parse_list(value)) if match is not None else ()
+        return lookup
+    def precautions(name):
+        match = rows('precautions_df', 'Disease', name)
+        if match is None:
+            return ()
+        return tuple(str(v).strip() for row in match.reindex(columns=PRECAUTION_COLS).itertuples(index=False)
+                     for v in row if isinstance(v, str) and v.strip())
+    def workouts(name):
+        match = rows('workout_df', 'disease', name)
+        return tuple(str(w).strip() for w in match['workout']) if match is not None else ()
+    return {
+        'description': description,
+        'diets': listed('diets_df', 'Diet'),
+        'medications': listed('meds_df', 'Medication'),
+        'precautions': precautions,
+        'workouts': workouts,
+    }
+def _timed_lookup(section, source, name):
+    with METRICS.timer(f"recommend.{section}"):
+        return source(name)
+class RecommendationService:
+    """Concurrent per-section lookups for one disease or a batch, as whole payloads or a stream of sections"""
+    def __init__(self, sources, max_workers=None):
+        self.sources = dict(sources)
+        self._max_workers = len(self.sources) if max_workers is None else max_workers
+        self._pool = None
+        self.after_fork()
+    def after_fork(self):
+        """Recreate the lookup pool in a forked worker; inline services (max_workers=0) have none"""
+        if self._max_workers:
+            self._pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix='recommend')
+    @classmethod
+    def from_records(cls, records, max_workers=0):
+        return cls(record_sources(records), max_workers)
+    @staticmethod
+    def _distinct(diseases):
+        return [diseases] if isinstance(diseases, str) else list(dict.fromkeys(diseases))
+    def stream(self, diseases):
+        """Submit every lookup now and return an iterator of Sections in completion order (in order when inline)"""
+        if self._pool is None:
+            return self._inline(diseases)
+        futures = {}
+        for disease in self._distinct(diseases):
+            name = clean_disease_name(disease)
+            for section, source in self.sources.items():
+                futures[self._pool.submit(_timed_lookup, section, source, name)] = (disease, section)
+        return self._completed(futures)
+    def _inline(self, diseases):
+        for disease in self._distinct(diseases):
+            name = clean_disease_name(disease)
+            for section, source in self.sources.items():
+                yield Section(disease, section, _timed_lookup(section, source, name))
+    def _completed(self, futures):
+        try:
+            for future in as_completed(futures):
+                disease, section = futures[future]
+                yield Section(disease, section, future.result())
+        finally:
+            for future in futures:
+                future.cancel()
+    def fetch_batch(self, diseases):
+        """{disease: payload} for every distinct disease, all lookups running together"""
+        payloads = {disease: {'disease': disease, **dict.fromkeys(self.sources)} for disease in self._distinct(diseases)}
+        for disease, section, value in self.stream(list(payloads)):
+            payloads[disease][section] = value
+        return payloads
+    def fetch(self, disease):
+        """One payload: the disease plus every section, in SECTIONS order"""
+        return self.fetch_batch([disease])[disease]
@@ -0,0 +1,74 @@
+"""Severity-weighted risk scoring from Symptom-severity.csv, aligned with the model's feature columns.
+
+The score is the notebook's: the sum of the severity weights of the entered symptoms, with
+urgency High at 15 or more, Medium at 8 or more, otherwise Low.
+"""
+import bisect
+from typing import NamedTuple
+import numpy as np
+from knowledge_base import clean_disease_name
+SEVERE_WEIGHT = 5
+URGENCY_THRESHOLDS = (8, 15)
+URGENCY_LEVELS = ('Low', 'Medium', 'High')
+class RiskAssessment(NamedTuple):
+    score: float
+    urgency: str
+    severe_symptoms: tuple
+    precautions: tuple
+def urgency_level(scores):
+    """Urgency label for one score, or an array of labels for an array of scores"""
+    if np.ndim(scores) == 0:
+        return URGENCY_LEVELS[bisect.bisect_right(URGENCY_THRESHOLDS, scores)]
+    return np.asarray(URGENCY_LEVELS, dtype=object)[np.searchsorted(URGENCY_THRESHOLDS, scores, side='right')]
+def _precautions(records, disease):
+    record = records.get(clean_disease_name(disease)) if records is not None and disease is not None else None
+    return record.precautions if record else ()
+class RiskScorer:
+    """Dense severity weight vector in feature order; scoring is one dot product per input or batch"""
+    def __init__(self, weights, symptom_names):
+        self.symptom_names = tuple(str(name) for name in symptom_names)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.weights.setflags(write=False)
+        if len(self.weights) != len(self.symptom_names):
+            raise ValueError(f"{len(self.weights)} weights for {len(self.symptom_names)} features")
+        self._severe = np.flatnonzero(self.weights >= SEVERE_WEIGHT)
+    @classmethod
+    def from_severity(cls, symptom_index, severity_df):
+        """Weights from a Symptom/weight frame; a symptom listed twice keeps its last weight, as in the notebook's dict"""
+        weights = np.zeros(len(symptom_index.feature_names))
+        for symptom, weight in zip(severity_df['Symptom'], severity_df['weight']):
+            key = symptom_index.key_for(symptom)
+            if key is not None:
+                # Duplicate feature columns (fluid_overload) are set together, so weight only the first
+                weights[symptom_index.columns[key][0]] = weight
+        return cls(weights, [symptom_index.key_for(feature) for feature in symptom_index.feature_names])
+    def score(self, vector):
+        return float(np.dot(vector, self.weights))
+    def score_many(self, X):
+        """Scores for every row of a dense or sparse feature matrix"""
+        return np.asarray(X @ self.weights).ravel()
+    def severe_symptoms(self, vector):
+        """Canonical names of the entered symptoms whose weight is at least SEVERE_WEIGHT"""
+        entered = self._severe[np.asarray(vector)[self._severe] != 0]
+        return tuple(self.symptom_names[col] for col in entered)
+    def assess(self, vector, disease=None, records=None):
+        """Score, urgency and severe symptoms for one input, with the predicted disease's precautions"""
+        score = self.score(vector)
+        return RiskAssessment(score, urgency_level(score), self.severe_symptoms(vector), _precautions(records, disease))
+    def assess_many(self, X, diseases=None, records=None):
+        """Batch version of assess(): one matrix product for the scores, then per-row lookups"""
+        scores = self.score_many(X)
+        levels = urgency_level(scores)
+        flags = X[:, self._severe]
+        flags = flags.toarray() if hasattr(flags, 'toarray') else np.asarray(flags)
+        rows, cols = np.nonzero(flags)
+        names = [self.symptom_names[col] for col in self._severe]
+        bounds = np.searchsorted(rows, np.arange(len(scores) + 1)).tolist()
+        cols = cols.tolist()
+        severe = (tuple(names[c] for c in cols[a:b]) for a, b in zip(bounds[:-1], bounds[1:]))
+        diseases = diseases if diseases is not None else [None] * len(scores)
+        precautions = {}
+        for score, level, row_severe, disease in zip(scores, levels, severe, diseases):
+            if disease not in precautions:
+                precautions[disease] = _precautions(records, disease)
+            yield RiskAssessment(float(score), level, row_severe, precautions[disease])
@@ -0,0 +1,255 @@
+"""Standalone HTTP prediction service with micro-batching.
+
+    python server.py --port 8000 --batch-window-ms 2
+    python server.py --port 8000 --workers 4 --model models/artifacts/svc
+
+POST /predict  {"symptoms": ["itching", "skin rash"]}  (or a comma separated string)
+GET  /health        liveness: this worker's pid and request counts
+GET  /ready         200 once this worker can serve predictions, 503 before
+GET  /metrics       stage latency histograms and counters (Prometheus text; /metrics.json for JSON)
+GET  /profile       collapsed stacks, when started with --profile
+"""
+import argparse
+import gc
+import json
+import os
+import queue
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from batch_predict import BatchPredictor
+from ensemble import Ensemble, add_ensemble_arguments, ensemble_from_args
+from loaders import DATA_DIR, MODEL_PATH
+from metrics import METRICS, SamplingProfiler, profiling_requested
+from symptom_index import parse_symptoms
+class MicroBatcher:
+    """Collects concurrent requests for up to window seconds and predicts them as one matrix"""
+    def __init__(self, predictor, window=0.002, max_batch=256, top_k=5, differential_k=0, recommendations=False):
+        self.predictor = predictor
+        self.window = window
+        self.max_batch = max_batch
+        self.top_k = top_k
+        self.differential_k = differential_k
+        self.recommendations = recommendations
+        self.batches = 0
+        self.requests = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+    @property
+    def ready(self):
+        return self._thread.is_alive()
+    def submit(self, tokens):
+        future = Future()
+        self._queue.put((tokens, future, time.perf_counter()))
+        return future
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    def _run(self):
+        while True:
+            batch = self._collect()
+            token_lists = [tokens for tokens, _, _ in batch]
+            METRICS.observe("server.queue_wait", (time.perf_counter() - batch[0][2]) * 1000)
+            try:
+                with METRICS.timer("server.batch"):
+                    results = list(self.predictor.predict_chunk(
+                        token_lists, self.top_k, self.differential_k, self.recommendations))
+            except Exception as exc:
+                for _, future, _ in batch:
+                    future.set_exception(exc)
+                continue
+            self.batches += 1
+            self.requests += len(batch)
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+class PredictionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    batcher = None
+    profiler = None
+    timeout_seconds = 10.0
+    def setup(self):
+        super().setup()
+        # Responses are small; don't let Nagle hold them back waiting for the client's ACK
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode(), "application/json")
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {
+                "status": "ok",
+                "pid": os.getpid(),
+                "requests": self.batcher.requests,
+                "batches": self.batcher.batches,
+            })
+        elif self.path == "/ready":
+            ready = self.batcher is not None and self.batcher.ready
+            self._send_json(200 if ready else 503, {"ready": ready, "pid": os.getpid()})
+        elif self.path == "/metrics":
+            self._send(200, METRICS.prometheus().encode(), "text/plain; version=0.0.4")
+        elif self.path == "/metrics.json":
+            self._send_json(200, METRICS.snapshot())
+        elif self.path == "/profile" and self.profiler is not None:
+            self._send(200, self.profiler.collapsed().encode(), "text/plain")
+        else:
+            self._send_json(404, {"error": "not found"})
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            tokens = parse_symptoms(payload.get("symptoms", []) if isinstance(payload, dict) else payload)
+        except (ValueError, TypeError, AttributeError) as exc:
+            self._send_json(400, {"error": f"invalid request: {exc}"})
+            return
+        try:
+            with METRICS.timer("server.request"):
+                result = self.batcher.submit(tokens).result(timeout=self.timeout_seconds)
+        except Exception as exc:
+            self._send_json(500, {"error": str(exc)})
+            return
+        self._send_json(200, result)
+    def log_message(self, format, *args):
+        pass
+class PredictionServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+    def get_request(self):
+        # Prefork workers share a non-blocking listening socket; connections themselves block
+        conn, address = super().get_request()
+        conn.setblocking(True)
+        return conn, address
+def make_server(host, port, batcher, profiler=None):
+    handler = type("BoundPredictionHandler", (PredictionHandler,), {"batcher": batcher, "profiler": profiler})
+    return PredictionServer((host, port), handler)
+def warm_up(predictor):
+    """One prediction, so lazily built state (token cache, fuzzy index, model arrays) exists before forking"""
+    list(predictor.predict_chunk([parse_symptoms("itching, skin rash, fatigue")], differential_k=1, recommendations=True))
+def start_worker(server, predictor, args):
+    batcher = MicroBatcher(predictor, args.batch_window_ms / 1000, args.max_batch, args.top_k, args.differential,
+                           args.recommendations)
+    server.RequestHandlerClass.batcher = batcher
+    METRICS.register("batcher", lambda: {"requests": batcher.requests, "batches": batcher.batches})
+    return batcher
+def serve_prefork(server, predictor, args, profile=False):
+    """Fork args.workers children that serve the parent's listening socket, restarting any that die.
+
+    The predictor is loaded and warmed up once in the parent, and gc.freeze() keeps the collector
+    from touching (and so un-sharing) the inherited objects in every child. With an mmap'd artifact
+    (--model models/artifacts/svc) the model arrays are shared page cache even across restarts.
+    """
+    warm_up(predictor)
+    gc.freeze()
+    server.socket.setblocking(False)
+    children = {}
+    stopping = False
+    def spawn():
+        pid = os.fork()
+        if pid:
+            children[pid] = time.monotonic()
+            return
+        code = 0
+        try:
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+            signal.signal(signal.SIGINT, lambda *_: sys.exit(0))
+            if isinstance(predictor.model, Ensemble):
+                predictor.model.after_fork()
+            if predictor.recommendations is not None:
+                predictor.recommendations.after_fork()
+            start_worker(server, predictor, args)
+            if profile:
+                server.RequestHandlerClass.profiler = SamplingProfiler().start()
+            server.serve_forever()
+        except SystemExit:
+            pass
+        except BaseException:
+            code = 1
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(args.workers):
+        spawn()
+    print(f"Serving predictions on http://{args.host}:{server.server_address[1]} "
+          f"with {args.workers} workers (pids {', '.join(map(str, children))})", flush=True)
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        started = children.pop(pid, None)
+        if stopping or started is None:
+            continue
+        print(f"worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting", file=sys.stderr, flush=True)
+        # Don't spin if workers die on startup
+        if time.monotonic() - started < 1.0:
+            time.sleep(1.0)
+        spawn()
+    server.server_close()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model", default=MODEL_PATH)
+    add_ensemble_arguments(parser)
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--batch-window-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--differential", type=int, default=0, metavar="K",
+                        help="add the top-K differential diagnosis with probabilities to every response")
+    parser.add_argument("--recommendations", action="store_true",
+                        help="add the predicted disease's recommendation payload (see recommendations.py) to every response")
+    parser.add_argument("--profile", action="store_true", help="run the sampling profiler and serve GET /profile")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="prefork this many worker processes sharing one loaded model (POSIX only)")
+    args = parser.parse_args(argv)
+    predictor = BatchPredictor.from_paths(args.model, args.data_dir, ensemble_from_args(args))
+    profile = args.profile or profiling_requested()
+    if args.workers > 1:
+        server = make_server(args.host, args.port, None)
+        serve_prefork(server, predictor, args, profile)
+        return
+    profiler = SamplingProfiler().start() if profile else None
+    server = make_server(args.host, args.port, None, profiler)
+    start_worker(server, predictor, args)
+    print(f"Serving predictions on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from fuzzy import FuzzyResolver, squash
+_DUPLICATE_SUFFIX = re.compile(r"\.\d+$")
+_SEPARATORS = re.compile(r"[\s_]+")
+_TOKEN_CACHE_SIZE = 65536
+def normalize_symptom(name):
+    """Canonical symptom key: 'Skin Rash', 'skin_rash' and 'spotting_ urination' style variants collapse to snake_case"""
+    return _SEPARATORS.sub("_", str(name).strip().lower()).strip("_")
+def parse_symptoms(value):
+    """Split comma separated free text (or clean a list of symptoms) into non-empty tokens"""
+    tokens = value.split(",") if isinstance(value, str) else value
+    return [str(token).strip() for token in tokens if token is not None and str(token).strip()]
+class SymptomIndex:
+    """Maps free-text symptoms to model feature columns in O(1)"""
+    def __init__(self, feature_names, aliases=(), fuzzy=False):
+        self.feature_names = tuple(feature_names)
+        lookup, squashed = {}, {}
+        for col, feature in enumerate(self.feature_names):
+            # Training.csv repeats fluid_overload; pandas reads the second copy as fluid_overload.1
+            key = normalize_symptom(_DUPLICATE_SUFFIX.sub("", feature))
+            lookup.setdefault(key, []).append(col)
+            squashed.setdefault(squash(key), key)
+        for alias in aliases:
+            key = normalize_symptom(alias)
+            target = squashed.get(squash(key))
+            if key not in lookup and target is not None:
+                lookup[key] = lookup[target]
+        self.canonical = {key: normalize_symptom(_DUPLICATE_SUFFIX.sub("", self.feature_names[cols[0]]))
+                          for key, cols in lookup.items()}
+        self.columns = {key: tuple(cols) for key, cols in lookup.items()}
+        self._squashed = squashed
+        self._token_cache = {}
+        # Typo correction is the last resort, after exact, normalized and squashed lookups
+        self.fuzzy = FuzzyResolver(self.columns) if fuzzy else None
+    @classmethod
+    def from_files(cls, training_csv, severity_csv=None, fuzzy=False):
+        feature_names = pd.read_csv(training_csv, nrows=0).columns.drop("prognosis", errors="ignore")
+        aliases = pd.read_csv(severity_csv)["Symptom"].tolist() if severity_csv else ()
+        return cls(feature_names, aliases, fuzzy)
+    def _exact_key(self, token):
+        key = normalize_symptom(token)
+        return key if key in self.columns else self._squashed.get(squash(key))
+    def corrections(self, tokens):
+        """(token, key) pairs for the tokens that only resolved through typo correction"""
+        return [(token, self.key_for(token)) for token in tokens
+                if self.fuzzy is not None and self._exact_key(token) is None and self.key_for(token) is not None]
+    def key_for(self, token):
+        """Canonical key for a token, or None if it matches no feature"""
+        try:
+            return self._token_cache[token]
+        except KeyError:
+            pass
+        key = self._exact_key(token)
+        if key is None and self.fuzzy is not None:
+            key = self.fuzzy.correct(token)
+        result = self.canonical[key] if key is not None else None
+        if len(self._token_cache) >= _TOKEN_CACHE_SIZE:
+            self._token_cache.clear()
+        self._token_cache[token] = result
+        return result
+    def resolve(self, tokens):
+        """Return (canonical keys, unmatched tokens), de-duplicated in input order"""
+        keys, unmatched = [], []
+        for token in tokens:
+            key = self.key_for(token)
+            if key is None:
+                unmatched.append(token)
+            elif key not in keys:
+                keys.append(key)
+        return keys, unmatched
+    def vectorize(self, tokens):
+        """Dense 0/1 feature vector for one input plus the tokens that were dropped"""
+        keys, unmatched = self.resolve(tokens)
+        vector = np.zeros(len(self.feature_names))
+        for key in keys:
+            vector[list(self.columns[key])] = 1
+        return vector, unmatched
+    def vectorize_many(self, token_lists, dense=False, dtype=np.float64):
+        """Feature matrix (CSR unless dense=True) for many inputs plus per-row unmatched tokens"""
+        indptr, indices, unmatched = [0], [], []
+        for tokens in token_lists:
+            keys, dropped = self.resolve(tokens)
+            indices.extend(sorted(col for key in keys for col in self.columns[key]))
+            indptr.append(len(indices))
+            unmatched.append(dropped)
+        data = np.ones(len(indices), dtype=dtype)
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, len(self.feature_names)))
+        return (matrix.toarray() if dense else matrix), unmatched
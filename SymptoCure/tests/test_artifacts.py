@@ -0,0 +1,69 @@
+"""Exported artifacts predict what their pickles predict on Training.csv.
+
+Run from the SymptoCure directory:  python -m pytest -q tests
+
+Each pickle in models/ is exported to a temporary directory and compared on the clean rows and
+on rows with 40% of symptoms dropped (as in evaluate.CONDITIONS). The linear SVC artifact scores
+pairs from the primal coef_ while libsvm sums over support vectors; where libsvm's pairwise score
+is zero (both classes equally likely) the two round to opposite signs, the vote goes the other
+way and the prediction can change. That happens on none of the clean rows and on a handful of
+the dropout rows; test_svc_differs_only_on_exact_ties asserts every difference is such a tie.
+"""
+import copy
+import os
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+from artifacts import export_model, load_artifact
+from loaders import MODELS_DIR, read_model
+from perturbation import perturb
+PICKLES = sorted(os.path.splitext(f)[0] for f in os.listdir(MODELS_DIR) if f.endswith(".pkl"))
+pytestmark = pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+@pytest.fixture(scope="module")
+def training():
+    frame = pd.read_csv(os.path.join(APP_DIR, "datasets", "Training.csv"))
+    y = frame.pop("prognosis")
+    X = frame.to_numpy(dtype=np.float64)
+    dropped = perturb(X, np.random.default_rng(0), dropout=0.4).astype(np.float64)
+    return X, dropped, y, list(frame.columns)
+def exported(name, tmp_path):
+    try:
+        model = read_model(os.path.join(MODELS_DIR, f"{name}.pkl"))
+    except (ImportError, AttributeError) as exc:
+        pytest.skip(f"{name}.pkl does not unpickle with the installed libraries: {exc!r}")
+    export_model(model, str(tmp_path))
+    return model, load_artifact(str(tmp_path))
+@pytest.mark.parametrize("name", [name for name in PICKLES if name != "svc"])
+def test_artifact_matches_pickle(name, training, tmp_path):
+    model, artifact = exported(name, tmp_path)
+    for X in training[:2]:
+        np.testing.assert_array_equal(artifact.predict(X), model.predict(X))
+        np.testing.assert_allclose(artifact.predict_proba(X), model.predict_proba(X), atol=1e-6)
+def test_svc_differs_only_on_exact_ties(training, tmp_path):
+    model, artifact = exported("svc", tmp_path)
+    clean, dropped, _, _ = training
+    np.testing.assert_array_equal(artifact.predict(clean), model.predict(clean))
+    np.testing.assert_allclose(artifact.predict_proba(dropped), model.predict_proba(dropped), atol=1e-9)
+    differ = np.flatnonzero(artifact.predict(dropped) != model.predict(dropped))
+    assert len(differ) < 0.01 * len(dropped)
+    ovo = copy.copy(model)
+    ovo.decision_function_shape = "ovo"
+    expected = ovo.decision_function(dropped[differ])
+    actual = artifact._pairwise(dropped[differ])
+    flipped = (expected > 0) != (actual > 0)
+    assert flipped.any(axis=1).all()
+    assert np.abs(expected[flipped]).max() < 1e-12
+def test_gradient_boosting_packed_trees(training, tmp_path):
+    from sklearn.ensemble import GradientBoostingClassifier
+    X, dropped, y, features = training
+    model = GradientBoostingClassifier(n_estimators=10, random_state=0).fit(pd.DataFrame(X, columns=features), y)
+    export_model(model, str(tmp_path))
+    artifact = load_artifact(str(tmp_path))
+    # One set of node arrays for all 410 trees, not five files per tree
+    assert len(os.listdir(tmp_path)) == 8
+    for rows in (X, dropped):
+        np.testing.assert_array_equal(artifact.predict(rows), model.predict(rows))
+        np.testing.assert_allclose(artifact.predict_proba(rows), model.predict_proba(rows), atol=1e-12)
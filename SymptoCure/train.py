@@ -0,0 +1,202 @@
+"""Retrain the notebook's model zoo on Training.csv in parallel and refresh models/ and model_results.csv.
+
+    python train.py                        # train every model, one process per model
+    python train.py --incremental          # skip models whose data and hyperparameters are unchanged
+    python train.py --models svc decision_tree --jobs 2
+
+Same split (test_size=0.3, random_state=42) and hyperparameters as SymtoCure.ipynb. Features are
+held as a uint8 frame (0.6 MB instead of 5 MB of int64). Each model trains in a fresh worker
+process so its wall time and peak RSS are its own; both are recorded in models/train_manifest.json
+and model_results.csv ("Fit Memory MB" is the peak RSS above the worker's baseline during fit,
+predict and pickling).
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import resource
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import sklearn
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+from sklearn.model_selection import train_test_split
+from sklearn.naive_bayes import MultinomialNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+from threadpoolctl import threadpool_limits
+from class_map import normalize_label, write_class_map
+from kb_bundle import TRAINING_FILE, load_bundle
+from loaders import BASE_DIR, DATA_DIR, MODELS_DIR
+RESULTS_PATH = os.path.join(BASE_DIR, "model_results.csv")
+MANIFEST_NAME = "train_manifest.json"
+SPLIT = {"test_size": 0.3, "random_state": 42}
+# model_results.csv: the notebook's columns, then the timing and memory ones train.py adds
+RESULT_COLUMNS = ["Model", "Accuracy", "Precision", "Recall", "F1-Score",
+                  "Fit Seconds", "Wall Seconds", "Peak RSS MB", "Fit Memory MB"]
+def model_slug(name):
+    """File stem the notebook uses for a display name: 'Logistic Regression' -> logistic_regression"""
+    return name.lower().replace(" ", "_")
+def model_zoo():
+    """Display name -> unfitted estimator, as in SymtoCure.ipynb"""
+    zoo = {
+        'SVC': SVC(kernel='linear', probability=True),
+        'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42),
+        'Gradient Boosting': GradientBoostingClassifier(n_estimators=100, random_state=42),
+        'K-Neighbors': KNeighborsClassifier(n_neighbors=5),
+        'Multinomial NB': MultinomialNB(),
+        'Decision Tree': DecisionTreeClassifier(random_state=42),
+        'Logistic Regression': LogisticRegression(max_iter=1000),
+    }
+    try:
+        from xgboost import XGBClassifier
+        zoo['XGBoost'] = XGBClassifier(random_state=42)
+    except ImportError:
+        warnings.warn("xgboost is not installed; skipping the XGBoost model")
+    return zoo
+def params_fingerprint(estimator):
+    """Hash of the estimator class, library version and hyperparameters (thread counts excluded)"""
+    params = {k: v for k, v in estimator.get_params().items() if k != "n_jobs"}
+    module = type(estimator).__module__.split(".")[0]
+    version = getattr(sys.modules.get(module), "__version__", sklearn.__version__)
+    payload = json.dumps([type(estimator).__name__, module, version, params], sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode()).hexdigest()
+def load_training(data_dir=DATA_DIR):
+    """(uint8 feature frame, label codes, normalized labels, sha256 of Training.csv)"""
+    bundle = load_bundle(data_dir)
+    X, y, raw_labels, features = bundle.training()
+    frame = pd.DataFrame(X, columns=[str(f) for f in features])
+    labels = [normalize_label(label) for label in raw_labels]
+    return frame, y.astype(int), labels, bundle.manifest["sources"][TRAINING_FILE]["sha256"]
+def _reset_peak_rss():
+    # Linux: writing 5 to clear_refs resets VmHWM, so the next reading covers only the fit
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+def _rss_mb(field="VmHWM"):
+    """Peak (VmHWM) or current (VmRSS) resident memory of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+def _dump_atomic(model, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".pkl.tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(model, f)
+    os.replace(tmp_path, path)
+def train_one(name, estimator, X_train, y_train, X_test, y_test, model_path, threads=None):
+    """Fit, pickle and score one model; runs in its own worker process"""
+    _reset_peak_rss()
+    baseline = _rss_mb("VmRSS")
+    start = time.perf_counter()
+    # Cap BLAS/OpenMP threads so parallel workers don't oversubscribe the cores
+    with threadpool_limits(threads):
+        estimator.fit(X_train, y_train)
+        fit_seconds = time.perf_counter() - start
+        y_pred = estimator.predict(X_test)
+    _dump_atomic(estimator, model_path)
+    precision, recall, f1, _ = precision_recall_fscore_support(y_test, y_pred, average="weighted", zero_division=0)
+    return {
+        "Model": name,
+        "Accuracy": accuracy_score(y_test, y_pred),
+        "Precision": precision,
+        "Recall": recall,
+        "F1-Score": f1,
+        "Fit Seconds": round(fit_seconds, 3),
+        "Wall Seconds": round(time.perf_counter() - start, 3),
+        "Peak RSS MB": round(_rss_mb(), 1),
+        "Fit Memory MB": round(_rss_mb() - baseline, 1),
+    }
+class UnknownModelError(ValueError):
+    """A requested model name is not in model_zoo()"""
+def read_manifest(models_dir):
+    path = os.path.join(models_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+def write_manifest(models_dir, manifest):
+    with open(os.path.join(models_dir, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+def train(names=None, data_dir=DATA_DIR, models_dir=MODELS_DIR, results_path=RESULTS_PATH,
+          jobs=None, incremental=False):
+    """Train the selected models (default: all) and return the results frame"""
+    zoo = model_zoo()
+    if names:
+        unknown = set(names) - {model_slug(n) for n in zoo}
+        if unknown:
+            raise UnknownModelError(f"unknown models: {', '.join(sorted(unknown))}; choose from {[model_slug(n) for n in zoo]}")
+        zoo = {name: est for name, est in zoo.items() if model_slug(name) in names}
+    X, y, labels, data_hash = load_training(data_dir)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, **SPLIT)
+    os.makedirs(models_dir, exist_ok=True)
+    manifest = read_manifest(models_dir)
+    fingerprints = {
+        name: {"data_sha256": data_hash, "split": SPLIT, "params_sha256": params_fingerprint(est)}
+        for name, est in zoo.items()
+    }
+    pending = {}
+    for name in zoo:
+        slug = model_slug(name)
+        model_path = os.path.join(models_dir, f"{slug}.pkl")
+        previous = manifest.get(slug, {})
+        if incremental and os.path.exists(model_path) and previous.get("fingerprint") == fingerprints[name]:
+            print(f"{name}: unchanged, skipped")
+            continue
+        pending[name] = model_path
+    started = time.perf_counter()
+    # One task per child process: peak RSS is per model and memory is returned after each fit
+    workers = max(1, jobs or min(len(pending), os.cpu_count() or 1))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, max_tasks_per_child=1) as pool:
+        futures = {
+            pool.submit(train_one, name, zoo[name], X_train, y_train, X_test, y_test, path, threads): name
+            for name, path in pending.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            result = future.result()
+            slug = model_slug(name)
+            write_class_map(pending[name], labels)
+            manifest[slug] = {"fingerprint": fingerprints[name], "result": result, "trained_at": time.time()}
+            write_manifest(models_dir, manifest)
+            print(f"{name}: accuracy {result['Accuracy']:.4f}, fit {result['Fit Seconds']:.2f}s, "
+                  f"peak RSS {result['Peak RSS MB']:.0f} MB")
+    print(f"trained {len(pending)} of {len(zoo)} models in {time.perf_counter() - started:.1f}s")
+    # Results for every model in the zoo, including ones skipped this run
+    rows = [manifest[model_slug(name)]["result"] for name in model_zoo() if model_slug(name) in manifest]
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+    results.to_csv(results_path, index=False)
+    return results
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--models", nargs="*", default=None, help="model file stems, e.g. svc decision_tree (default: all)")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--models-dir", default=MODELS_DIR)
+    parser.add_argument("--results", default=RESULTS_PATH)
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: one per model, up to the core count)")
+    parser.add_argument("--incremental", action="store_true", help="skip models whose data and hyperparameters are unchanged")
+    parser.add_argument("--export-artifacts", action="store_true", help="also refresh models/artifacts/ (see artifacts.py)")
+    args = parser.parse_args(argv)
+    try:
+        train(args.models, args.data_dir, args.models_dir, args.results, args.jobs, args.incremental)
+    except UnknownModelError as exc:
+        raise SystemExit(f"--models: {exc}")
+    if args.export_artifacts:
+        from artifacts import export_all
+        export_all(args.models, args.models_dir, os.path.join(args.models_dir, "artifacts"))
+if __name__ == "__main__":
+    main()